@@ -0,0 +1,75 @@
+"""
+Benchmark: joining KCP study fields to FGOS with a DataFrame merge vs the
+bisect-based CodeIndex, on the KCP table replicated to ~100k rows.
+
+Also times the hierarchical join (a study field resolved to its own FGOS or
+the nearest indexed parent group), which a plain merge cannot express.
+"""
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from common.code_index import CodeIndex, cached_index
+from common.schemas import INTEGER, STRING, CsvSchema
+
+REPLICAS = 500
+FGOS_SCHEMA = CsvSchema({"fgos_code": STRING, "fgos_name": STRING})
+
+
+@cached_index
+def build_fgos_index(csv_path) -> CodeIndex:
+    """
+    FGOS names by code, plus the enlarged groups (09, 09.03) so hierarchy
+    lookups have parents to fall back to.
+    """
+    fgos = FGOS_SCHEMA.read(csv_path)
+    groups = {}
+    for code in fgos["fgos_code"]:
+        level = code.rpartition(".")[0]
+        while level:
+            groups[level] = f"группа {level}"
+            level = level.rpartition(".")[0]
+    return CodeIndex([*groups.items(), *zip(fgos["fgos_code"], fgos["fgos_name"])])
+
+
+def join_merge(kcp, fgos) -> int:
+    joined = kcp.merge(fgos[["fgos_code", "fgos_name"]], how="left",
+                       left_on="study_field_code", right_on="fgos_code")
+    return int(joined["fgos_name"].notna().sum())
+
+
+def join_index(kcp, index) -> int:
+    names = index.lookup(kcp["study_field_code"])
+    return sum(name is not None for name in names)
+
+
+def join_hierarchical(kcp, index) -> int:
+    names = index.lookup(kcp["study_field_code"], hierarchical=True)
+    return sum(name is not None for name in names)
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    matched = func(*args)
+    return matched, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    kcp = CsvSchema({"year": INTEGER, "study_field_code": STRING, "study_field_name": STRING,
+                     "kcp_num": INTEGER}).read(ROOT / "kcp" / "kcp.csv")
+    fgos = FGOS_SCHEMA.read(ROOT / "fgos" / "fgos.csv")
+    kcp = pd.concat([kcp] * REPLICAS, ignore_index=True)
+
+    index = build_fgos_index(str(ROOT / "fgos" / "fgos.csv"))
+    print(f"{len(kcp)} KCP rows, {len(index)} indexed codes")
+    for name, func, other in [
+        ("merge", join_merge, fgos),
+        ("index", join_index, index),
+        ("hierarchy", join_hierarchical, index),
+    ]:
+        matched, elapsed = timed(func, kcp, other)
+        print(f"  {name:>9}: {matched} matched in {elapsed * 1000:7.1f} ms")
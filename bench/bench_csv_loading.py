@@ -0,0 +1,60 @@
+"""
+Benchmark: CSV loading with inferred dtypes plus a whole-frame
+astype(str)/strip pass vs the typed CsvSchema read used by the loaders,
+with the default C parser and with the pyarrow engine.
+
+Runs on the raw OKPDTR classifier export and the professional-standards registry
+CSVs and reports the best wall time over several repeats.
+"""
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from common.schemas import STRING, CsvSchema
+
+# name: (csv path, required columns, read_csv options)
+DATASETS = {
+    "okpdtr": (ROOT / "prof_classificator" / "classifierOkpdtr_7UTF-8.csv",
+               ["Код", "Наименование профессии"], {"sep": ";"}),
+    "prof_standard": (ROOT / "prof_standard" / "prof_standard.csv", [
+        "prof_standard_code", "prof_standard_sphere", "prof_standard_type", "prof_standard_name"
+    ], {}),
+}
+REPEATS = 10
+
+
+def load_inferred(csv_path, columns, read_kwargs) -> int:
+    df = pd.read_csv(csv_path, encoding='utf-8', **read_kwargs)
+    df = df[columns].dropna()
+    df = df.astype(str).apply(lambda col: col.str.strip())
+    return len(df)
+
+
+def load_schema(csv_path, columns, read_kwargs, engine) -> int:
+    return len(CsvSchema(dict.fromkeys(columns, STRING)).read(csv_path, engine=engine, **read_kwargs))
+
+
+def best_of(func, *args):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        rows = func(*args)
+        timings.append(time.perf_counter() - started)
+    return rows, min(timings)
+
+
+if __name__ == "__main__":
+    for dataset, (csv_path, columns, read_kwargs) in DATASETS.items():
+        size_kib = csv_path.stat().st_size / 1024
+        print(f"{dataset} ({size_kib:.0f} KiB)")
+        for name, func, args in [
+            ("inferred", load_inferred, (csv_path, columns, read_kwargs)),
+            ("schema", load_schema, (csv_path, columns, read_kwargs, "c")),
+            ("pyarrow", load_schema, (csv_path, columns, read_kwargs, "pyarrow")),
+        ]:
+            rows, elapsed = best_of(func, *args)
+            print(f"  {name:>8}: {rows} rows in {elapsed * 1000:7.1f} ms")
@@ -0,0 +1,130 @@
+"""
+Benchmark: every loader end to end against a local mock API.
+
+Starts ``bench/mock_api.py`` on a free port, points each loader's API
+URLs at it and runs the loader's ``main()`` on the bundled CSV/XLSX files
+(hr gets a generated vacancy dump, the real one is not in the repo). Upload
+flags are passed through, so strategies can be compared run against run:
+
+    python bench/bench_loaders.py --latency 20
+    python bench/bench_loaders.py --latency 20 --async --concurrency 64 --batch-size 50
+    python bench/bench_loaders.py kcp fgos --error-rate 0.05
+    python bench/bench_loaders.py kcp --error-rate 0.2 --fail-after-write --no-idempotency
+
+Reports wall time, rows accepted by the mock API, rows/s, requests, p95
+request latency, bytes sent and requests answered from the idempotency
+store (replays) per loader.
+"""
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from common.cli import loader_parser, upload_argv
+from common.metrics import METRICS
+from mock_api import MockApi
+from run_all import JOBS, load_job_module
+
+HH_DUMP_ROWS = 200_000
+
+
+def make_hh_dump(csv_path: Path, n_rows: int = HH_DUMP_ROWS, seed: int = 1):
+    """
+    Synthetic hh.ru vacancy dump with the columns hr/main.py aggregates.
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.date_range('2024-01-01', periods=90).strftime('%d.%m.%Y')
+    roles = [f"Роль {i}" for i in range(150)]
+    pd.DataFrame({
+        'id': np.arange(n_rows),
+        'entry_date': rng.choice(days, n_rows),
+        'professional_roles_name': rng.choice(roles, n_rows),
+        'name': 'Вакансия',
+    }).to_csv(csv_path, index=False)
+
+
+def point_at(module, base_url: str):
+    """
+    Rewrites every http(s) URL constant of a loader module to ``base_url``,
+    keeping the path, so the loader uploads to the mock API.
+    """
+    base = urlsplit(base_url)
+    for name, value in vars(module).items():
+        if isinstance(value, str) and value.startswith(('http://', 'https://')):
+            setattr(module, name, urlsplit(value)._replace(scheme=base.scheme, netloc=base.netloc).geturl())
+
+
+def run_loader(job, api: MockApi, argv: list, workdir: Path, verbose: bool = False) -> dict:
+    module = load_job_module(job)
+    point_at(module, api.base_url)
+    if job.name == 'hr':
+        hh_dump = workdir / 'perm_krai.csv'
+        if not hh_dump.exists():
+            make_hh_dump(hh_dump)
+        module.csv_file_path = str(hh_dump)
+
+    api.reset()
+    METRICS.reset()
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    started = time.perf_counter()
+    with output:
+        module.main(argv)
+    wall = time.perf_counter() - started
+
+    endpoints = [record for record in METRICS.records() if record['type'] == 'endpoint']
+    return {
+        'wall': wall,
+        'rows': api.rows,
+        'requests': api.requests,
+        'errors': api.errors,
+        'replays': api.replays,
+        'p95': max((record['p95'] for record in endpoints), default=0.0),
+        'bytes': sum(record['bytes_sent'] for record in endpoints),
+    }
+
+
+def main(argv=None):
+    parser = loader_parser("Run every loader against a local mock API and report throughput")
+    parser.add_argument('loaders', nargs='*', help='loaders to run (default: all)')
+    parser.add_argument('--latency', type=float, default=0.0, help='mock API latency, ms per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests failing')
+    parser.add_argument('--error-status', type=int, default=503, help='status of failing requests')
+    parser.add_argument('--fail-after-write', action='store_true',
+                        help='mock API applies failing requests anyway (lost responses)')
+    parser.add_argument('--no-idempotency', action='store_true',
+                        help='mock API ignores Idempotency-Key headers')
+    parser.add_argument('--verbose', action='store_true', help="show the loaders' own output")
+    args = parser.parse_args(argv)
+
+    jobs = [job for job in JOBS if not args.loaders or job.name in args.loaders]
+    with tempfile.TemporaryDirectory() as workdir, \
+            MockApi(latency=args.latency / 1000, error_rate=args.error_rate,
+                    error_status=args.error_status, seed=0, fail_after_write=args.fail_after_write,
+                    idempotency=not args.no_idempotency) as api:
+        # Journals would skip rows on the next run; dead letters stay out of the repo
+        loader_argv = upload_argv(args) + ['--no-journal']
+        if '--dead-letter' not in loader_argv:
+            loader_argv += ['--dead-letter', str(Path(workdir) / 'failed_rows.jsonl')]
+
+        print(f"🧪 Mock API {api.base_url}: latency {args.latency:g} ms, error rate {args.error_rate:g}")
+        print(f"   loader flags: {' '.join(loader_argv)}\n")
+        print(f"{'loader':<20} {'wall s':>8} {'rows':>7} {'rows/s':>9} {'requests':>9} "
+              f"{'errors':>7} {'replays':>8} {'p95 ms':>8} {'KiB sent':>9}")
+        for job in jobs:
+            stats = run_loader(job, api, loader_argv, Path(workdir), args.verbose)
+            print(f"{job.name:<20} {stats['wall']:8.2f} {stats['rows']:7d} "
+                  f"{stats['rows'] / stats['wall']:9.0f} {stats['requests']:9d} {stats['errors']:7d} "
+                  f"{stats['replays']:8d} {stats['p95'] * 1000:8.1f} {stats['bytes'] / 1024:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: load-then-upload vs the streaming pipeline (``--stream``).
+
+Runs prof_classificator and prof_standard in a fresh interpreter each,
+against a local mock API, once reading the whole CSV before the first
+request and once with ``--stream`` (reading, cleaning and uploading in
+overlapping chunks). The bundled CSVs are repeated ``--scale`` times, with
+the codes made unique, to stand in for larger files:
+
+    python bench/bench_pipeline.py --scale 10 --latency 5 --batch-size 100
+
+Reports wall time and peak RSS (VmHWM, Linux only) of the loader process,
+and the rows stored by the mock API.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from mock_api import MockApi
+
+# loader module: (source CSV, separator, code column, how the CSV is passed)
+LOADERS = {
+    "prof_classificator.main": (ROOT / "prof_classificator" / "classifierOkpdtr_7UTF-8.csv", ';', "Код", "global"),
+    "prof_standard.main": (ROOT / "prof_standard" / "prof_standard.csv", ',', "prof_standard_code", "argv"),
+}
+
+# Runs in a fresh interpreter: point the loader at the mock API, run it, report peak RSS
+CHILD = """
+import importlib, json, sys
+sys.path.insert(0, {root!r})
+module = importlib.import_module({module!r})
+module.api_endpoint = {api_endpoint!r}
+argv = {argv!r}
+if {pass_as!r} == 'global':
+    module.csv_file_path = {csv_path!r}
+else:
+    argv = [{csv_path!r}] + argv
+module.main(argv)
+with open('/proc/self/status') as f:
+    peak_kib = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+print(json.dumps({{'peak_kib': peak_kib}}))
+"""
+
+
+def scaled_csv(source: Path, sep: str, code_column: str, scale: int, workdir: Path) -> Path:
+    """
+    ``source`` repeated ``scale`` times, the codes suffixed so no row is a
+    duplicate. Line breaks inside cells become spaces: on larger files they
+    can fall on a pyarrow block boundary, which its parser cannot read.
+    """
+    df = pd.read_csv(source, sep=sep, dtype=str, keep_default_na=False)
+    df = df.replace(r'[\r\n]+', ' ', regex=True)
+    copies = []
+    for i in range(scale):
+        copy = df.copy()
+        copy[code_column] = copy[code_column] + (f"-{i}" if i else "")
+        copies.append(copy)
+    path = workdir / source.name
+    pd.concat(copies).to_csv(path, sep=sep, index=False)
+    return path
+
+
+def run(module: str, csv_path: Path, pass_as: str, api: MockApi, argv: list) -> dict:
+    code = CHILD.format(root=str(ROOT), module=module, api_endpoint=f"{api.base_url}/{module}/",
+                        argv=argv, pass_as=pass_as, csv_path=str(csv_path))
+    api.reset()
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    stats = json.loads(output.stdout.strip().splitlines()[-1])
+    stats['seconds'] = time.perf_counter() - started
+    stats['rows'] = api.rows
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare load-then-upload with the streaming pipeline")
+    parser.add_argument('--scale', type=int, default=10, help='copies of each bundled CSV')
+    parser.add_argument('--latency', type=float, default=5.0, help='mock API latency, ms per request')
+    parser.add_argument('--batch-size', type=int, default=100, help='rows per request')
+    parser.add_argument('--concurrency', type=int, default=8, help='requests in flight')
+    args = parser.parse_args(argv)
+
+    loader_argv = ['--no-journal', '--batch-size', str(args.batch_size),
+                   '--concurrency', str(args.concurrency)]
+    with tempfile.TemporaryDirectory() as workdir, MockApi(latency=args.latency / 1000) as api:
+        print(f"🧪 Mock API {api.base_url}: latency {args.latency:g} ms, CSVs x{args.scale}, "
+              f"loader flags: {' '.join(loader_argv)}\n")
+        print(f"{'loader':<20} {'mode':<8} {'rows':>7} {'wall s':>8} {'peak RSS MiB':>13}")
+        for module, (source, sep, code_column, pass_as) in LOADERS.items():
+            csv_path = scaled_csv(source, sep, code_column, args.scale, Path(workdir))
+            for mode, extra in [("load", []), ("stream", ['--stream'])]:
+                stats = run(module, csv_path, pass_as, api, loader_argv + extra)
+                print(f"{module.split('.')[0]:<20} {mode:<8} {stats['rows']:7d} "
+                      f"{stats['seconds']:8.2f} {stats['peak_kib'] / 1024:13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark: professional-standards registry workbook, full pandas load vs
+the openpyxl read-only stream used by prof_standard/main.py.
+
+Reports wall time and peak traced memory of turning the registry into
+cleaned prof_standard_* rows.
+"""
+import glob
+import importlib.util
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_spec = importlib.util.spec_from_file_location("prof_standard_main", ROOT / "prof_standard" / "main.py")
+prof_standard_main = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(prof_standard_main)
+COLUMNS = ["prof_standard_code", "prof_standard_sphere", "prof_standard_type", "prof_standard_name"]
+
+
+def load_with_pandas(xlsx_path) -> int:
+    df = pd.read_excel(xlsx_path, sheet_name=0)
+    df = df[COLUMNS].dropna().astype(str).apply(lambda col: col.str.strip())
+    return len(df)
+
+
+def load_streaming(xlsx_path) -> int:
+    return sum(1 for _ in prof_standard_main.iter_profstandards_xlsx(xlsx_path))
+
+
+def measure(func, xlsx_path):
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = func(xlsx_path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, elapsed, peak
+
+
+if __name__ == "__main__":
+    xlsx_path = sys.argv[1] if len(sys.argv) > 1 else glob.glob(str(ROOT / "prof_standard" / "*.xlsx"))[0]
+    for name, func in [("pandas", load_with_pandas), ("streaming", load_streaming)]:
+        rows, elapsed, peak = measure(func, xlsx_path)
+        print(f"{name:>9}: {rows} rows in {elapsed:6.2f} s, peak {peak / 2**20:7.1f} MiB")
@@ -0,0 +1,61 @@
+"""
+Micro-benchmark: payload building with df.iterrows() vs common.records.
+
+Uses the stat_otchetnost payload shape (str, rounded float, int) and reports
+the cost per 10k rows, including json.dumps of every payload.
+"""
+import json
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.records import as_int, iter_payloads, rounded
+
+ROWS = 10_000
+REPEAT = 5
+
+
+def make_frame(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "okved_group": rng.choice(["Добыча полезных ископаемых", "Строительство", "Образование"], n),
+        "worker_num": rng.random(n) * 100,
+        "year": rng.integers(2010, 2024, n),
+    })
+
+
+def build_iterrows(df: pd.DataFrame) -> list:
+    return [
+        (idx, {
+            "okved_group": row["okved_group"],
+            "worker_num": round(row["worker_num"], 3),
+            "year": int(row["year"])
+        })
+        for idx, row in df.iterrows()
+    ]
+
+
+def build_vectorized(df: pd.DataFrame) -> list:
+    return list(iter_payloads(
+        df,
+        ["okved_group", "worker_num", "year"],
+        casts={"worker_num": rounded(3), "year": as_int}
+    ))
+
+
+def encode(rows: list) -> int:
+    return sum(len(json.dumps(payload)) for _, payload in rows)
+
+
+if __name__ == "__main__":
+    df = make_frame(ROWS)
+    assert build_iterrows(df) == build_vectorized(df)
+
+    for name, build in [("iterrows", build_iterrows), ("vectorized", build_vectorized)]:
+        build_time = min(timeit.repeat(lambda: build(df), number=1, repeat=REPEAT))
+        total_time = min(timeit.repeat(lambda: encode(build(df)), number=1, repeat=REPEAT))
+        print(f"{name:>10}: build {build_time * 1000:8.1f} ms, build+json {total_time * 1000:8.1f} ms per {ROWS} rows")
@@ -0,0 +1,85 @@
+"""
+Benchmark: pandas vs the pure-Python csv path (``--no-pandas``) for the
+small reference datasets (OKVED, FGOS, KCP).
+
+For each path it reports the cold start the way a cron job pays it (a fresh
+interpreter importing the loader, reading the CSV and building every
+payload; best of several runs, with the peak RSS of that process, Linux
+only) and the warm in-process time of reading and building payloads alone.
+"""
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# name: (loader module, pandas loader, csv loader, payload fields, integer fields)
+DATASETS = {
+    "okved": ("okved.main", "load_okved_csv", "load_okved_records", ["okved_code", "okved_name"], []),
+    "fgos": ("fgos.main", "load_fgos_csv", "load_fgos_records", ["fgos_code", "fgos_name", "fgos_prikaz"], []),
+    "kcp": ("kcp.main", "load_kcp_csv", "load_kcp_records",
+            ["kcp_num", "study_field_code", "study_field_name", "year"], ["kcp_num", "year"]),
+}
+COLD_REPEATS = 5
+WARM_REPEATS = 50
+
+# Runs in a fresh interpreter: import, read, build payloads, report peak RSS
+CHILD = """
+import importlib, json, sys
+sys.path.insert(0, {root!r})
+from common.records import as_int, iter_payloads, iter_record_payloads
+module = importlib.import_module({module!r})
+data = getattr(module, {loader!r})(module.csv_file_path)
+if isinstance(data, list):
+    rows = list(iter_record_payloads(data, {fields!r}))
+else:
+    rows = list(iter_payloads(data, {fields!r}, {{col: as_int for col in {int_fields!r}}}))
+# VmHWM, unlike ru_maxrss, does not inherit the parent's peak across fork+exec (Linux)
+with open('/proc/self/status') as f:
+    peak_kib = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+print(json.dumps({{'rows': len(rows), 'peak_kib': peak_kib}}))
+"""
+
+
+def cold_run(module, loader, fields, int_fields) -> dict:
+    code = CHILD.format(root=str(ROOT), module=module, loader=loader, fields=fields, int_fields=int_fields)
+    runs = []
+    for _ in range(COLD_REPEATS):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        stats = json.loads(output.stdout.strip().splitlines()[-1])
+        stats['seconds'] = time.perf_counter() - started
+        runs.append(stats)
+    return min(runs, key=lambda stats: stats['seconds'])
+
+
+def warm_run(module, loader, fields, int_fields) -> float:
+    import importlib
+    from common.records import as_int, iter_payloads, iter_record_payloads
+
+    module = importlib.import_module(module)
+    load = getattr(module, loader)
+    casts = {col: as_int for col in int_fields}
+    timings = []
+    for _ in range(WARM_REPEATS):
+        started = time.perf_counter()
+        data = load(module.csv_file_path)
+        if isinstance(data, list):
+            list(iter_record_payloads(data, fields))
+        else:
+            list(iter_payloads(data, fields, casts))
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    print(f"{'dataset':<8} {'path':<8} {'rows':>5} {'cold ms':>8} {'peak RSS MiB':>13} {'warm ms':>8}")
+    for dataset, (module, pandas_loader, csv_loader, fields, int_fields) in DATASETS.items():
+        for path, loader in [("pandas", pandas_loader), ("csv", csv_loader)]:
+            cold = cold_run(module, loader, fields, int_fields)
+            warm = warm_run(module, loader, fields, int_fields)
+            print(f"{dataset:<8} {path:<8} {cold['rows']:>5} {cold['seconds'] * 1000:8.0f} "
+                  f"{cold['peak_kib'] / 1024:13.1f} {warm * 1000:8.2f}")
@@ -0,0 +1,232 @@
+"""
+Local stand-in for the dataset API, for benchmarks and dry runs.
+
+Accepts what the loaders send to any path: POST of one JSON object or a
+JSON array (201 with the stored rows), PUT to ``<path>/<id>`` (200) and
+GET with ``skip``/``limit`` paging over what was posted, so ``--sync``
+and the foreign-key resolver work against it too. Every request can be
+delayed by a fixed latency and fail with a configurable rate and status.
+
+A repeated ``Idempotency-Key`` gets the stored response back instead of
+writing again. With ``fail_after_write`` the injected errors hit after the
+write (the response is lost, the row is stored), which is what the keys
+protect against; ``idempotency=False`` shows what happens without them.
+
+    python bench/mock_api.py --port 8000 --latency 20 --error-rate 0.01
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class MockApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in one segment, without Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+    wbufsize = 1 << 16
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def api(self) -> 'MockApi':
+        return self.server.api
+
+    def _reply(self, status: int, body):
+        data = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def _handle(self, method: str):
+        body = self._read_body()
+        if self.api.latency:
+            time.sleep(self.api.latency)
+        status = self.api.injected_error()
+        if status is not None and not self.api.fail_after_write:
+            return self._reply(status, {'detail': 'injected error'})
+
+        key = self.headers.get('Idempotency-Key') if self.api.idempotency and method != 'GET' else None
+        stored = self.api.apply(key, lambda: self._write(method, body))
+        if status is not None:
+            return self._reply(status, {'detail': 'injected error'})
+        return self._reply(*stored)
+
+    def _write(self, method: str, body) -> tuple:
+        url = urlparse(self.path)
+        path = url.path.rstrip('/')
+        if method == 'GET':
+            query = parse_qs(url.query)
+            skip = int(query.get('skip', [0])[0])
+            limit = int(query.get('limit', [100])[0])
+            return 200, self.api.list(path, skip, limit)
+        if method == 'POST':
+            return 201, self.api.create(path, body)
+        collection, _, record_id = path.rpartition('/')
+        record = self.api.update(collection, record_id, body)
+        return (200, record) if record else (404, {'detail': 'Not found'})
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+
+class MockApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops SYNs when the async engine opens dozens
+    # of connections at once, adding 1 s retransmits to the latencies
+    request_queue_size = 256
+
+
+class MockApi:
+    """
+    - latency: seconds added to every request
+    - error_rate: share of requests answered with ``error_status`` instead
+    - fail_after_write: injected errors are sent after the request was applied
+    - idempotency: honour ``Idempotency-Key`` headers
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, seed: int = None,
+                 fail_after_write: bool = False, idempotency: bool = True):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fail_after_write = fail_after_write
+        self.idempotency = idempotency
+        self.requests = 0
+        self.errors = 0
+        self.replays = 0
+        self.tables = {}          # path -> {id: record}
+        self.responses = {}       # Idempotency-Key -> (status, body)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._key_lock = threading.Lock()
+        self._server = MockApiServer((host, port), MockApiHandler)
+        self._server.api = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def rows(self) -> int:
+        with self._lock:
+            return sum(len(table) for table in self.tables.values())
+
+    def injected_error(self):
+        with self._lock:
+            self.requests += 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors += 1
+                return self.error_status
+        return None
+
+    def apply(self, key, write) -> tuple:
+        """
+        Runs ``write()`` once per idempotency key; repeats get its stored response.
+        """
+        if key is None:
+            return write()
+        with self._key_lock:
+            stored = self.responses.get(key)
+            if stored is not None:
+                self.replays += 1
+                return stored
+            stored = self.responses[key] = write()
+            return stored
+
+    def list(self, path: str, skip: int, limit: int) -> list:
+        with self._lock:
+            return list(self.tables.get(path, {}).values())[skip:skip + limit]
+
+    def create(self, path: str, body):
+        items = body if isinstance(body, list) else [body]
+        with self._lock:
+            table = self.tables.setdefault(path, {})
+            created = []
+            for item in items:
+                record = dict(item, id=len(table) + 1)
+                table[record['id']] = record
+                created.append(record)
+        return created if isinstance(body, list) else created[0]
+
+    def update(self, path: str, record_id: str, body):
+        with self._lock:
+            table = self.tables.get(path, {})
+            if not record_id.isdigit() or int(record_id) not in table:
+                return None
+            record = table[int(record_id)] = dict(body, id=int(record_id))
+            return record
+
+    def reset(self):
+        with self._lock:
+            self.tables.clear()
+            self.responses.clear()
+            self.requests = 0
+            self.errors = 0
+            self.replays = 0
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self) -> 'MockApi':
+        """
+        Serves from a background thread.
+        """
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the dataset API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help='milliseconds per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of failed requests')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--fail-after-write', action='store_true',
+                        help='apply failing requests anyway, as if the response was lost')
+    parser.add_argument('--no-idempotency', action='store_true', help='ignore Idempotency-Key headers')
+    args = parser.parse_args(argv)
+
+    api = MockApi(args.host, args.port, args.latency / 1000, args.error_rate, args.error_status,
+                  fail_after_write=args.fail_after_write, idempotency=not args.no_idempotency)
+    print(f"🧪 Mock API on {api.base_url} (latency {args.latency:g} ms, "
+          f"error rate {args.error_rate:g})")
+    try:
+        api.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
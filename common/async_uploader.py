@@ -0,0 +1,252 @@
+"""
+Asyncio upload engine, an alternative to the thread-pool ``Uploader``.
+
+Keeps up to ``concurrency`` requests in flight on a single aiohttp session,
+which suits high-latency remote hosts better than one thread per request.
+Retries, AIMD concurrency, dead letters and metrics work as in the
+thread-pool engine. Requires the optional ``aiohttp`` dependency.
+"""
+import asyncio
+import json
+import time
+
+import aiohttp
+
+from common.dedup import IDEMPOTENCY_HEADER, idempotency_key
+from common.metrics import METRICS
+from common.retry import AimdLimit, DeadLetterFile, RetryPolicy, is_congestion, parse_retry_after
+from common.uploader import DEFAULT_HEADERS, UploadResult, iter_batches
+
+
+class AsyncConcurrencyGate:
+    """
+    Event-loop counterpart of ``common.retry.ConcurrencyGate``.
+    """
+
+    def __init__(self, limit: AimdLimit):
+        self.limit = limit
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            while True:
+                pause = self.limit.pause_remaining()
+                if pause == 0 and self.in_flight < self.limit.current:
+                    break
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=pause or 0.1)
+                except asyncio.TimeoutError:
+                    pass
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+
+class AsyncUploader:
+    """
+    Drop-in counterpart of ``Uploader``: same ``post_rows`` signature and
+    the same ``UploadResult`` accounting, but driven by an event loop.
+    """
+
+    def __init__(self, concurrency: int = 32, pool_maxsize: int = None,
+                 timeout: float = 30.0, headers: dict = None, batch_size: int = 1,
+                 retry: RetryPolicy = None, dead_letter=None):
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.retry = retry or RetryPolicy()
+        self.limit = AimdLimit(self.concurrency)
+        self.dead_letter = DeadLetterFile(dead_letter) if dead_letter else None
+        self.pool_maxsize = pool_maxsize or self.concurrency
+        self.timeout = timeout
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        # Sessions live only for the duration of one post_rows call.
+        if self.dead_letter is not None:
+            self.dead_letter.close()
+
+    async def request(self, session, gate: AsyncConcurrencyGate, method: str, api_url: str,
+                      payload=None, params: dict = None, expected_status: int = None,
+                      rows: int = 1):
+        """
+        Sends one request through ``gate``, retrying transient failures.
+        Returns ``(status, text, error)`` of the last attempt; ``status`` is
+        None when it ended in a connection error or timeout, or when the
+        payload is not valid JSON (e.g. NaN; never retried).
+        Requests with a body carry an ``Idempotency-Key``, the same on every attempt.
+        """
+        body = None
+        headers = None
+        if payload is not None:
+            started = time.perf_counter()
+            try:
+                body = json.dumps(payload, allow_nan=False).encode()
+            except ValueError as e:
+                return None, None, e
+            headers = {IDEMPOTENCY_HEADER: idempotency_key(method, api_url, body)}
+            METRICS.add_serialize(method, api_url, time.perf_counter() - started)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            status, text, error, retry_after = None, None, None, None
+            async with gate:
+                started = time.perf_counter()
+                try:
+                    async with session.request(method, api_url, data=body, params=params,
+                                               headers=headers) as response:
+                        status = response.status
+                        text = await response.text()
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = e
+                elapsed = time.perf_counter() - started
+
+            ok = status is not None and (status == expected_status
+                                         or expected_status is None and status < 400)
+            METRICS.observe_request(method, api_url, started, elapsed, len(body or b''), ok, rows)
+            if ok:
+                self.limit.on_success()
+                return status, text, None
+
+            if is_congestion(status):
+                self.limit.on_congestion(f"Status {status}" if status else type(error).__name__, retry_after)
+            if not self.retry.should_retry(attempt, status):
+                return status, text, error
+            await asyncio.sleep(self.retry.backoff(attempt, retry_after))
+
+    def _session(self, **kwargs) -> aiohttp.ClientSession:
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        return aiohttp.ClientSession(timeout=timeout, headers=self.headers, **kwargs)
+
+    def put(self, api_url: str, payload, idx=None, expected_status: int = 200) -> bool:
+        return asyncio.run(self.put_async(api_url, payload, idx, expected_status))
+
+    async def put_async(self, api_url: str, payload, idx=None, expected_status: int = 200) -> bool:
+        async with self._session() as session:
+            return await self._send(session, AsyncConcurrencyGate(self.limit), api_url, idx, payload,
+                                    expected_status, method='PUT')
+
+    def post_json(self, api_url: str, payload, idx=None, expected_status: int = 201):
+        """
+        POSTs one row and returns the decoded response (the created record),
+        or None when the row failed for good.
+        """
+        return asyncio.run(self.post_json_async(api_url, payload, idx, expected_status))
+
+    async def post_json_async(self, api_url: str, payload, idx=None, expected_status: int = 201):
+        async with self._session() as session:
+            text = await self._send_row(session, AsyncConcurrencyGate(self.limit), api_url, idx,
+                                        payload, expected_status)
+        return None if text is None else json.loads(text)
+
+    def get_json(self, api_url: str, params: dict = None):
+        return asyncio.run(self.get_json_async(api_url, params))
+
+    async def get_json_async(self, api_url: str, params: dict = None):
+        async with self._session() as session:
+            status, text, error = await self.request(session, AsyncConcurrencyGate(self.limit),
+                                                     'GET', api_url, params=params)
+        if status is None:
+            raise error
+        if status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=status, message=text)
+        return json.loads(text)
+
+    def post_rows(self, api_url: str, rows, expected_status: int = 201,
+                  on_success=None) -> UploadResult:
+        """
+        Posts every (idx, payload) pair from ``rows`` and returns the counts.
+        ``on_success(payload)`` is called for every accepted row.
+        """
+        return asyncio.run(self.post_rows_async(api_url, rows, expected_status, on_success))
+
+    async def post_rows_async(self, api_url: str, rows, expected_status: int = 201,
+                              on_success=None) -> UploadResult:
+        result = UploadResult()
+        rows = METRICS.timed_rows(rows, 'POST', api_url)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        gate = AsyncConcurrencyGate(self.limit)
+        connector = aiohttp.TCPConnector(limit=self.pool_maxsize, limit_per_host=self.pool_maxsize)
+
+        async with self._session(connector=connector) as session:
+
+            async def send(batch):
+                try:
+                    oks = await self._send_batch(session, gate, api_url, batch, expected_status)
+                finally:
+                    semaphore.release()
+                for (idx, payload), ok in zip(batch, oks):
+                    result.record(idx, ok)
+                    if ok and on_success is not None:
+                        on_success(payload)
+
+            tasks = set()
+            for batch in iter_batches(rows, self.batch_size):
+                # Acquire before creating the task so rows are pulled lazily
+                await semaphore.acquire()
+                task = asyncio.create_task(send(batch))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        return result
+
+    def _give_up(self, api_url: str, rows: list, reason: str, method: str, expected_status: int):
+        if self.dead_letter is not None:
+            for idx, payload in rows:
+                self.dead_letter.write(api_url, idx, payload, reason, method, expected_status)
+
+    async def _send_batch(self, session, gate, api_url: str, batch: list, expected_status: int) -> list:
+        if self.batch_size > 1:
+            payloads = [payload for _, payload in batch]
+            status, _, error = await self.request(session, gate, 'POST', api_url, payloads,
+                                                  expected_status=expected_status, rows=len(batch))
+            if status == expected_status:
+                return [True] * len(batch)
+            reason = f"Exception occurred — {error}" if status is None else f"Status {status}"
+            if self.retry.is_transient(status) and not isinstance(error, ValueError):
+                # Retries are used up on a transient error: row by row would only repeat them
+                print(f"❌ Rows {batch[0][0]}..{batch[-1][0]}: {reason}, "
+                      f"gave up after {self.retry.max_attempts} attempts")
+                self._give_up(api_url, batch, reason, 'POST', expected_status)
+                return [False] * len(batch)
+            print(f"↩️ Batch of rows {batch[0][0]}..{batch[-1][0]} rejected ({reason}), retrying row by row")
+
+        return [await self._send(session, gate, api_url, idx, payload, expected_status)
+                for idx, payload in batch]
+
+    async def _send(self, session, gate, api_url: str, idx, payload, expected_status: int,
+                    method: str = 'POST') -> bool:
+        return await self._send_row(session, gate, api_url, idx, payload, expected_status,
+                                    method) is not None
+
+    async def _send_row(self, session, gate, api_url: str, idx, payload, expected_status: int,
+                        method: str = 'POST'):
+        """
+        Returns the accepted response text, or None once the row is given up on.
+        """
+        status, text, error = await self.request(session, gate, method, api_url, payload,
+                                                 expected_status=expected_status)
+        if status is None:
+            reason = f"Exception occurred — {error}"
+        elif status != expected_status:
+            reason = f"Status {status}, Response: {text}"
+        else:
+            return text
+        print(f"❌ Row {idx}: {reason}")
+        self._give_up(api_url, [(idx, payload)], reason, method, expected_status)
+        return None
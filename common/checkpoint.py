@@ -0,0 +1,80 @@
+"""
+Append-only checkpoint journal for resumable uploads.
+
+Every row the API accepted is recorded as one ``<api_url>\t<row key>`` line
+in a ``.journal`` file next to the source dataset. A rerun skips rows whose
+key is already in the journal for the same endpoint, so an interrupted push
+continues where it stopped instead of re-sending (and duplicating) everything.
+"""
+from pathlib import Path
+
+from common.records import row_key
+
+
+class CheckpointJournal:
+    """
+    - path: journal file, created on first write
+    - key_fields: payload fields that identify a row, e.g. ["study_field_code", "year"]
+    """
+
+    def __init__(self, path, key_fields):
+        self.path = Path(path)
+        self.key_fields = list(key_fields)
+        self.skipped = 0
+        self._done = set()
+        self._file = None
+
+        if self.path.exists():
+            with self.path.open(encoding='utf-8') as f:
+                for line in f:
+                    api_url, sep, key = line.rstrip('\n').partition('\t')
+                    if sep:
+                        self._done.add((api_url, key))
+
+    @classmethod
+    def for_source(cls, source_path, key_fields):
+        """
+        Journal stored next to the source file: ``kcp.csv.journal``.
+        """
+        source_path = Path(source_path)
+        return cls(source_path.with_name(source_path.name + '.journal'), key_fields)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return len(self._done)
+
+    def row_key(self, payload: dict) -> str:
+        return row_key(payload, self.key_fields)
+
+    def pending(self, api_url: str, rows):
+        """
+        Yields only the (idx, payload) pairs not yet accepted by ``api_url``.
+        """
+        for idx, payload in rows:
+            if (api_url, self.row_key(payload)) in self._done:
+                self.skipped += 1
+                continue
+            yield idx, payload
+
+    def mark(self, api_url: str, payload: dict):
+        key = self.row_key(payload)
+        if self._file is None:
+            self._file = self.path.open('a', encoding='utf-8')
+        self._file.write(f"{api_url}\t{key}\n")
+        self._file.flush()
+        self._done.add((api_url, key))
+
+    def reset(self):
+        self.close()
+        self.path.unlink(missing_ok=True)
+        self._done.clear()
@@ -0,0 +1,101 @@
+"""
+Command-line flags shared by the loader scripts.
+
+Every script builds its parser with ``loader_parser()``, adds its own
+arguments and parses the command line once, so shared flags and
+script-specific positionals never get mixed up.
+"""
+import argparse
+from contextlib import nullcontext
+
+from common.checkpoint import CheckpointJournal
+from common.metrics import METRICS
+from common.retry import DEFAULT_DEAD_LETTER, RetryPolicy
+from common.uploader import make_uploader
+
+DEFAULT_RETRIES = RetryPolicy().max_attempts - 1
+
+
+def loader_parser(description: str = None) -> argparse.ArgumentParser:
+    """
+    Parser with the upload flags every loader understands:
+      --async            use the asyncio engine instead of the thread pool
+      --concurrency N    number of requests in flight
+      --batch-size N     rows per request, posted as one JSON array
+      --no-journal       upload every row, do not record progress
+      --reset-journal    forget previous progress and start over
+      --sync             diff against the server and send only new/changed rows
+      --retries N        resend transient failures (429, 502-504, timeouts) N times
+      --dead-letter PATH where rows that failed for good are saved for replay
+      --metrics PATH     write stage timings and request stats (.prom: Prometheus)
+    """
+    parser = argparse.ArgumentParser(description=description)
+    upload = parser.add_argument_group('upload')
+    upload.add_argument('--async', dest='use_async', action='store_true',
+                        help='use the asyncio engine instead of the thread pool')
+    upload.add_argument('--concurrency', type=int, default=None,
+                        help='number of requests in flight')
+    upload.add_argument('--batch-size', type=int, default=1,
+                        help='rows per request, posted as one JSON array')
+    upload.add_argument('--no-journal', action='store_true',
+                        help='upload every row, do not record progress')
+    upload.add_argument('--reset-journal', action='store_true',
+                        help='forget previous progress and start over')
+    upload.add_argument('--sync', action='store_true',
+                        help='diff against the server and send only new/changed rows')
+    upload.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help='resend transient failures (429, 502-504, timeouts) this many times')
+    upload.add_argument('--dead-letter', default=DEFAULT_DEAD_LETTER,
+                        help='file where rows that failed for good are saved for replay')
+    upload.add_argument('--metrics', default=None,
+                        help='write stage timings and request stats as JSON lines '
+                             '(Prometheus text for a .prom file, - for stdout)')
+    return parser
+
+
+def uploader_from_args(args):
+    return make_uploader(args.use_async, args.concurrency, batch_size=args.batch_size,
+                         retry=RetryPolicy(max_attempts=args.retries + 1),
+                         dead_letter=args.dead_letter)
+
+
+def write_metrics(args):
+    """
+    Writes ``METRICS`` to the ``--metrics`` destination, if one was given.
+    """
+    if args.metrics:
+        METRICS.write(args.metrics)
+
+
+def journal_from_args(args, source_path, key_fields):
+    """
+    Opens the checkpoint journal next to ``source_path`` unless disabled.
+    Returns a context manager yielding the journal (or None when disabled).
+    """
+    if args.no_journal:
+        return nullcontext()
+    journal = CheckpointJournal.for_source(source_path, key_fields)
+    if args.reset_journal:
+        journal.reset()
+    return journal
+
+
+def upload_argv(args) -> list:
+    """
+    Turns parsed upload flags back into argv, to forward them to other loaders.
+    """
+    argv = []
+    if args.use_async:
+        argv.append('--async')
+    if args.concurrency is not None:
+        argv += ['--concurrency', str(args.concurrency)]
+    if args.batch_size != 1:
+        argv += ['--batch-size', str(args.batch_size)]
+    if args.retries != DEFAULT_RETRIES:
+        argv += ['--retries', str(args.retries)]
+    if args.dead_letter != DEFAULT_DEAD_LETTER:
+        argv += ['--dead-letter', args.dead_letter]
+    for flag in ('no_journal', 'reset_journal', 'sync'):
+        if getattr(args, flag):
+            argv.append('--' + flag.replace('_', '-'))
+    return argv
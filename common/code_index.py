@@ -0,0 +1,181 @@
+"""
+Sorted-array index over hierarchical classifier codes.
+
+FGOS (09.03.01), KCP study fields (08.02.01), professional standards
+(01.001) and OKPDTR (10003) are all keyed by codes whose prefixes carry
+meaning: 09 is the enlarged group, 09.03 the bachelor level of it. A
+``CodeIndex`` keeps the codes sorted next to their values, so exact,
+prefix and parent/child lookups are a ``bisect`` (O(log n)) instead of a
+DataFrame merge or a scan. ``cached_index`` builds it once per source file
+content and keeps it on disk next to the frame cache.
+
+No loader joins datasets yet; ``bench/bench_code_index.py`` measures the
+index against the DataFrame merge it is meant to replace.
+"""
+from __future__ import annotations
+
+import functools
+import pickle
+import time
+from bisect import bisect_left
+from typing import TYPE_CHECKING
+
+from common.frame_cache import cache_path_for
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Sorts after every character that occurs in a code
+_PREFIX_END = '\uffff'
+
+
+class CodeIndex:
+    """
+    Immutable code -> value mapping over a sorted list of codes.
+    Codes are strings, hierarchy levels are separated by ``sep``.
+    """
+
+    def __init__(self, items, sep: str = '.'):
+        import numpy as np
+
+        pairs = sorted(dict(items).items())
+        self.codes = [code for code, _ in pairs]
+        self.values = [value for _, value in pairs]
+        self.sep = sep
+        # Array twins of codes/values for whole-column lookups
+        self._code_array = np.array(self.codes, dtype=str)
+        self._value_array = np.empty(len(self.values), dtype=object)
+        self._value_array[:] = self.values
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, code_column: str, value_column=None, sep: str = '.'):
+        """
+        - value_column: a column name, a list of columns (values become dicts),
+          or None to use the row index
+        """
+        codes = df[code_column].astype(str).str.strip().tolist()
+        if value_column is None:
+            values = df.index.tolist()
+        elif isinstance(value_column, str):
+            values = df[value_column].tolist()
+        else:
+            values = df[list(value_column)].to_dict('records')
+        return cls(zip(codes, values), sep)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return self._position(code) is not None
+
+    def _position(self, code):
+        pos = bisect_left(self.codes, code)
+        if pos < len(self.codes) and self.codes[pos] == code:
+            return pos
+        return None
+
+    def get(self, code, default=None):
+        pos = self._position(code)
+        return default if pos is None else self.values[pos]
+
+    def prefix(self, prefix: str) -> list:
+        """
+        All (code, value) pairs whose code starts with ``prefix``, in code order.
+        """
+        start = bisect_left(self.codes, prefix)
+        stop = bisect_left(self.codes, prefix + _PREFIX_END, lo=start)
+        return list(zip(self.codes[start:stop], self.values[start:stop]))
+
+    def parent_code(self, code: str):
+        head, sep, _ = code.rpartition(self.sep)
+        return head if sep else None
+
+    def ancestors(self, code: str) -> list:
+        """
+        Indexed (code, value) pairs above ``code``, nearest first.
+        """
+        found = []
+        code = self.parent_code(code)
+        while code is not None:
+            pos = self._position(code)
+            if pos is not None:
+                found.append((code, self.values[pos]))
+            code = self.parent_code(code)
+        return found
+
+    def children(self, code: str) -> list:
+        """
+        Indexed (code, value) pairs exactly one level below ``code``.
+        """
+        depth = code.count(self.sep) + 1
+        return [(child, value) for child, value in self.prefix(code + self.sep)
+                if child.count(self.sep) == depth]
+
+    def nearest(self, code: str, default=None):
+        """
+        Value of ``code`` itself, or of its closest indexed ancestor.
+        """
+        pos = self._position(code)
+        if pos is not None:
+            return self.values[pos]
+        ancestors = self.ancestors(code)
+        return ancestors[0][1] if ancestors else default
+
+    def lookup(self, codes, default=None, hierarchical: bool = False) -> list:
+        """
+        Resolves a column of codes, e.g. ``df['study_field_code']``: each distinct
+        code is found by one vectorized binary search per hierarchy level.
+        With ``hierarchical`` unmatched codes fall back to their nearest parent.
+        """
+        import numpy as np
+        import pandas as pd
+
+        labels, uniques = pd.factorize(pd.Series(codes, dtype=str))
+        resolved = np.full(len(uniques) + 1, default, dtype=object)  # [-1] is for missing codes
+
+        wanted = np.asarray(uniques, dtype=str)
+        positions = np.arange(len(wanted))
+        while len(wanted) and len(self.codes):
+            pos = np.searchsorted(self._code_array, wanted)
+            pos[pos == len(self._code_array)] = 0
+            found = self._code_array[pos] == wanted
+            resolved[positions[found]] = self._value_array[pos[found]]
+            if not hierarchical:
+                break
+            # Strip one level; codes without a separator have no parent left
+            parts = np.char.rpartition(wanted[~found], self.sep)
+            has_parent = parts[:, 1] != ''
+            wanted, positions = parts[has_parent, 0], positions[~found][has_parent]
+        return resolved[labels].tolist()
+
+
+def cached_index(func):
+    """
+    Decorator for ``build(file_path, ...) -> CodeIndex`` functions, keyed like
+    ``cached_frame`` by file content, the builder's module source and arguments.
+    Pass ``use_cache=False`` to force a rebuild.
+    """
+    @functools.wraps(func)
+    def wrapper(file_path, *args, use_cache: bool = True, **kwargs):
+        started = time.perf_counter()
+        if not use_cache:
+            return func(file_path, *args, **kwargs)
+
+        path = cache_path_for(func, file_path, args, kwargs, suffix='.index.pkl')
+        if path.exists():
+            with open(path, 'rb') as f:
+                index = pickle.load(f)
+            print(f"🗂️ {func.__name__}: index cache hit, loaded in {time.perf_counter() - started:.3f} s")
+            return index
+
+        index = func(file_path, *args, **kwargs)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(path)
+        print(f"🗂️ {func.__name__}: index cache miss, built {len(index)} codes "
+              f"in {time.perf_counter() - started:.3f} s")
+        return index
+
+    return wrapper
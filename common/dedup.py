@@ -0,0 +1,172 @@
+"""
+Pre-upload deduplication and idempotency keys.
+
+Source files repeat rows: fgos.csv lists some standards twice, the
+prof-standard registry has codes with two different descriptions. Before
+the upload every row is hashed once (``pd.util.hash_pandas_object``, one
+vectorized pass), exact copies are dropped and rows that share a key but
+differ elsewhere are reported, the first one being kept.
+
+Every POST/PUT also carries an ``Idempotency-Key`` header: the SHA-256 of
+the method, URL and JSON body. A retry, a rerun or a concurrent upload of
+the same row sends the same key, so a server that honours the header
+stores it only once, even when the first response was lost.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+# Conflicting keys printed per dataset; the rest are only counted
+MAX_REPORTED = 5
+
+
+def idempotency_key(method: str, api_url: str, body: bytes) -> str:
+    digest = hashlib.sha256(f"{method} {api_url}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def row_hashes(df: pd.DataFrame, columns) -> pd.Series:
+    """
+    64-bit hash of every row over ``columns``, independent of the index.
+    """
+    import pandas as pd
+
+    return pd.util.hash_pandas_object(df[list(columns)], index=False)
+
+
+def _report(name: str, exact: int, conflicts: dict):
+    if exact:
+        print(f"🧹 {name}: dropped {exact} exact duplicate rows")
+    if conflicts:
+        print(f"⚠️ {name}: {len(conflicts)} keys have rows with different values, "
+              f"keeping the first row of each:")
+        for key, idxs in list(conflicts.items())[:MAX_REPORTED]:
+            print(f"   {key}: rows {', '.join(map(str, idxs))}")
+        if len(conflicts) > MAX_REPORTED:
+            print(f"   ... and {len(conflicts) - MAX_REPORTED} more")
+
+
+def dedupe_frame(df: pd.DataFrame, key_fields, columns=None, name: str = 'rows') -> pd.DataFrame:
+    """
+    Drops exact duplicates over ``columns`` (default: all) and keeps only
+    the first row of every ``key_fields`` value, reporting the conflicts.
+    """
+    exact = row_hashes(df, columns or df.columns).duplicated()
+    df = df[~exact.to_numpy()]
+
+    key_hash = row_hashes(df, key_fields)
+    shared = key_hash.duplicated(keep=False).to_numpy()
+    conflicts = {}
+    if shared.any():
+        for key, group in df[shared].groupby(list(key_fields), sort=False, observed=True):
+            conflicts['|'.join(map(str, key if isinstance(key, tuple) else (key,)))] = group.index.tolist()
+        df = df[~key_hash.duplicated().to_numpy()]
+
+    _report(name, int(exact.sum()), conflicts)
+    return df
+
+
+def dedupe_records(records: list, key_fields, name: str = 'rows') -> list:
+    """
+    ``dedupe_frame`` for the (idx, record) pairs of ``CsvSchema.read_records``.
+    """
+    seen_rows = set()
+    first_by_key = {}
+    conflicts = {}
+    exact = 0
+    kept = []
+    for idx, record in records:
+        if record in seen_rows:
+            exact += 1
+            continue
+        seen_rows.add(record)
+        key = tuple(getattr(record, field) for field in key_fields)
+        if key in first_by_key:
+            conflicts.setdefault('|'.join(map(str, key)), [first_by_key[key]]).append(idx)
+            continue
+        first_by_key[key] = idx
+        kept.append((idx, record))
+
+    _report(name, exact, conflicts)
+    return kept
+
+
+def dedupe_payloads(rows, key_fields, name: str = 'rows'):
+    """
+    Streaming variant for (idx, payload) rows that are never held as a frame
+    (e.g. the xlsx registry); the report is printed once ``rows`` is exhausted.
+    Only the 64-bit ``hash()`` of every row and key is kept, not the rows,
+    so memory does not grow with the size of the values.
+    """
+    seen_rows = set()
+    first_by_key = {}
+    conflicts = {}
+    exact = 0
+    for idx, payload in rows:
+        row = hash(tuple(payload.items()))
+        if row in seen_rows:
+            exact += 1
+            continue
+        seen_rows.add(row)
+        key_values = tuple(payload[field] for field in key_fields)
+        key = hash(key_values)
+        if key in first_by_key:
+            conflicts.setdefault('|'.join(map(str, key_values)), [first_by_key[key]]).append(idx)
+            continue
+        first_by_key[key] = idx
+        yield idx, payload
+    _report(name, exact, conflicts)
+
+
+class ChunkDeduper:
+    """
+    ``dedupe_frame`` across the chunks of one stream (``common.pipeline``):
+    the hashes of the rows and keys seen so far are kept between chunks, so
+    memory grows by two integers per row, not by the rows. Call ``report``
+    once the stream is exhausted.
+    """
+
+    def __init__(self, key_fields, columns=None, name: str = 'rows'):
+        self.key_fields = list(key_fields)
+        self.columns = columns
+        self.name = name
+        self.seen_rows = set()
+        self.first_by_key = {}    # key hash -> idx of the row kept
+        self.conflicts = {}
+        self.exact = 0
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        row_hash = row_hashes(df, self.columns or df.columns).tolist()
+        key_hash = row_hashes(df, self.key_fields).tolist()
+        keep = []
+        for pos, (idx, row, key) in enumerate(zip(df.index.tolist(), row_hash, key_hash)):
+            if row in self.seen_rows:
+                self.exact += 1
+                continue
+            self.seen_rows.add(row)
+            if key in self.first_by_key:
+                label = '|'.join(map(str, df[self.key_fields].iloc[pos].tolist()))
+                self.conflicts.setdefault(label, [self.first_by_key[key]]).append(idx)
+                continue
+            self.first_by_key[key] = idx
+            keep.append(pos)
+        return df if len(keep) == len(df) else df.iloc[keep]
+
+    def report(self):
+        _report(self.name, self.exact, self.conflicts)
+
+
+def drop_duplicate_rows(data, key_fields, columns=None, name: str = 'rows'):
+    """
+    Dedupes a loader's DataFrame or its ``read_records`` list.
+    """
+    if isinstance(data, list):
+        return dedupe_records(data, key_fields, name)
+    return dedupe_frame(data, key_fields, columns, name)
@@ -0,0 +1,135 @@
+"""
+Cached name -> server ID resolution for foreign keys.
+
+Uploads like the minstat employment table reference a parent table
+(OKVED sections) by server ID. Instead of POSTing every parent on every run
+and re-fetching the whole parent table to rebuild the mapping, a
+``ForeignKeyResolver`` keeps the IDs in a small JSON file with a TTL,
+creates only the parents that are missing (in one pass, fetching the IDs
+once afterwards) and resolves the whole child column before the upload.
+"""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from common.sync import fetch_all
+from common.uploader import Uploader
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+
+
+class ForeignKeyResolver:
+    """
+    - api_url: parent endpoint, e.g. ".../okved_sections/"
+    - name_field: parent field the child rows refer to, e.g. "okved_section_name"
+    - make_payload: function(name) -> POST payload for a missing parent,
+      or None to only resolve existing ones
+    - cache_path: JSON file for the IDs, or None to keep them in memory only
+    - ttl: seconds before cached IDs are fetched again
+    """
+
+    def __init__(self, api_url: str, name_field: str, make_payload=None, cache_path=None,
+                 ttl: float = DEFAULT_TTL, id_field: str = 'id', expected_status: int = 201):
+        self.api_url = api_url
+        self.name_field = name_field
+        self.make_payload = make_payload
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.ttl = ttl
+        self.id_field = id_field
+        self.expected_status = expected_status
+        self._ids = None
+        self._from_cache = False
+
+    def _load_cache(self):
+        if self.cache_path is None or not self.cache_path.exists():
+            return None
+        try:
+            cached = json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if cached.get('api_url') != self.api_url or cached.get('name_field') != self.name_field:
+            return None
+        if time.time() - cached.get('fetched_at', 0) > self.ttl:
+            return None
+        return cached['ids']
+
+    def _save_cache(self):
+        if self.cache_path is None:
+            return
+        tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        tmp_path.write_text(json.dumps({
+            'api_url': self.api_url,
+            'name_field': self.name_field,
+            'fetched_at': time.time(),
+            'ids': self._ids,
+        }, ensure_ascii=False), encoding='utf-8')
+        tmp_path.replace(self.cache_path)
+
+    def invalidate(self):
+        """
+        Drops the cached IDs; the next lookup fetches them from the server.
+        """
+        self._ids = None
+        if self.cache_path is not None:
+            self.cache_path.unlink(missing_ok=True)
+
+    def refresh(self, uploader) -> dict:
+        records = fetch_all(uploader, self.api_url)
+        self._ids = {str(record[self.name_field]): record[self.id_field]
+                     for record in records if self.name_field in record}
+        self._from_cache = False
+        self._save_cache()
+        return self._ids
+
+    def ids(self, uploader) -> dict:
+        if self._ids is None:
+            self._ids = self._load_cache()
+            self._from_cache = self._ids is not None
+            if self._ids is None:
+                self.refresh(uploader)
+        return self._ids
+
+    def ensure(self, names, uploader: Uploader = None) -> dict:
+        """
+        Makes sure every name has a server ID, creating the missing parents.
+        Returns the full name -> ID mapping.
+        """
+        own_uploader = uploader is None
+        if own_uploader:
+            uploader = Uploader()
+
+        try:
+            names = list(dict.fromkeys(str(name) for name in names))
+            ids = self.ids(uploader)
+            missing = [name for name in names if name not in ids]
+            if missing and self._from_cache:
+                # Someone may have created them since the cache was written
+                ids = self.refresh(uploader)
+                missing = [name for name in missing if name not in ids]
+            if missing and self.make_payload is not None:
+                result = uploader.post_rows(
+                    self.api_url,
+                    ((name, self.make_payload(name)) for name in missing),
+                    expected_status=self.expected_status
+                )
+                self.refresh(uploader)
+                print(f"🔑 Created {result.success_count} of {len(missing)} missing parents "
+                      f"at {self.api_url}")
+            return self._ids
+        finally:
+            if own_uploader:
+                uploader.close()
+
+    def resolve(self, names: pd.Series, uploader: Uploader = None) -> pd.Series:
+        """
+        Maps a column of names to server IDs (nullable Int64, <NA> when unresolved),
+        creating missing parents first when ``make_payload`` is set.
+        """
+        ids = self.ensure(names.unique(), uploader)
+        return names.astype(str).map(ids).astype('Int64')
@@ -0,0 +1,106 @@
+"""
+Content-hash keyed cache for DataFrames parsed from slow sources (Excel).
+
+``pd.read_excel`` parses the whole workbook with openpyxl on every run. The
+``cached_frame`` decorator stores the parser's long-format result next to
+the source file, keyed by the file's SHA-256, the source of the module
+defining the parser and its arguments, and reuses it while none of them
+change. Hashing the whole module, not just the parser's bytecode, also
+catches edits to the helpers it calls (e.g. ``common.rosstat``'s
+extraction plans and layouts). Parquet is used when
+pyarrow is installed, pickle otherwise.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import importlib.util
+import inspect
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+CACHE_DIR_NAME = '.frame_cache'
+
+
+def file_digest(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def module_digest(module_name: str) -> str:
+    """
+    SHA-256 of a module's source file; changes whenever the module is edited.
+    """
+    return file_digest(inspect.getsourcefile(sys.modules[module_name]))
+
+
+def _parquet_available() -> bool:
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def cache_path_for(func, file_path, args=(), kwargs=None, suffix: str = None) -> Path:
+    """
+    Path of the cached frame for ``func(file_path, *args, **kwargs)``.
+    """
+    key = hashlib.sha256()
+    key.update(file_digest(file_path).encode())
+    key.update(func.__qualname__.encode())
+    key.update(module_digest(func.__module__).encode())
+    key.update(repr((args, sorted((kwargs or {}).items()))).encode())
+
+    if suffix is None:
+        suffix = '.parquet' if _parquet_available() else '.pkl'
+    file_path = Path(file_path)
+    return file_path.parent / CACHE_DIR_NAME / f"{file_path.stem}.{func.__name__}.{key.hexdigest()[:16]}{suffix}"
+
+
+def _read(path: Path) -> pd.DataFrame:
+    import pandas as pd
+
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def _write(df: pd.DataFrame, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    if path.suffix == '.parquet':
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    tmp_path.replace(path)
+
+
+def cached_frame(func):
+    """
+    Decorator for ``parse(file_path, ...) -> DataFrame`` functions.
+    Pass ``use_cache=False`` to force a fresh parse.
+    """
+    @functools.wraps(func)
+    def wrapper(file_path, *args, use_cache: bool = True, **kwargs):
+        started = time.perf_counter()
+        if not use_cache:
+            return func(file_path, *args, **kwargs)
+
+        path = cache_path_for(func, file_path, args, kwargs)
+        if path.exists():
+            df = _read(path)
+            print(f"🗂️ {func.__name__}: cache hit, loaded in {time.perf_counter() - started:.3f} s")
+            return df
+
+        df = func(file_path, *args, **kwargs)
+        _write(df.reset_index(drop=True), path)
+        print(f"🗂️ {func.__name__}: cache miss, parsed in {time.perf_counter() - started:.3f} s")
+        return df
+
+    return wrapper
@@ -0,0 +1,212 @@
+"""
+Lightweight timing and throughput instrumentation for the loaders.
+
+One process-wide ``METRICS`` registry collects:
+
+- stage durations per dataset (load, transform, upload, ...) via
+  ``METRICS.stage(dataset, name)``;
+- per endpoint: time spent building payloads (transform) and encoding them
+  (serialize), request latencies (p50/p95/p99), rows, bytes sent, errors
+  and rows/sec, recorded by both upload engines.
+
+``--metrics PATH`` writes it at the end of a run as JSON lines, or as
+Prometheus text exposition when PATH ends in ``.prom`` (``-`` for stdout).
+"""
+import json
+import math
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# ".../okved_sections/17" -> ".../okved_sections/{id}", so PUTs share one series
+_ID_SEGMENT = re.compile(r'/\d+/?$')
+
+
+def endpoint_label(api_url: str) -> str:
+    return _ID_SEGMENT.sub('/{id}', api_url)
+
+
+def quantile(sorted_values: list, q: float) -> float:
+    """
+    Nearest-rank quantile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+@dataclass
+class EndpointStats:
+    latencies: list = field(default_factory=list)
+    requests: int = 0
+    errors: int = 0
+    rows: int = 0
+    bytes_sent: int = 0
+    transform_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+    first_started: float = None
+    last_finished: float = None
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        span = (self.last_finished - self.first_started) if self.requests else 0.0
+        summary = {
+            'requests': self.requests,
+            'errors': self.errors,
+            'rows': self.rows,
+            'bytes_sent': self.bytes_sent,
+            'transform_seconds': round(self.transform_seconds, 6),
+            'serialize_seconds': round(self.serialize_seconds, 6),
+            'rows_per_second': round(self.rows / span, 2) if span > 0 else 0.0,
+            'latency_sum': round(sum(latencies), 6),
+        }
+        for q in QUANTILES:
+            summary[f'p{round(q * 100)}'] = round(quantile(latencies, q), 6)
+        return summary
+
+
+class Metrics:
+    """
+    Thread-safe registry; the upload engines record into it from worker threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}      # (dataset, stage) -> seconds
+            self.endpoints = {}   # (method, endpoint) -> EndpointStats
+
+    def _endpoint(self, method: str, api_url: str) -> EndpointStats:
+        key = (method, endpoint_label(api_url))
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = self.endpoints[key] = EndpointStats()
+        return stats
+
+    def add_stage(self, dataset: str, stage: str, seconds: float):
+        with self._lock:
+            key = (dataset, stage)
+            self.stages[key] = self.stages.get(key, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, dataset: str, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(dataset, stage, time.perf_counter() - started)
+
+    def timed_rows(self, rows, method: str, api_url: str):
+        """
+        Passes ``rows`` through, adding the time spent producing each one
+        (the lazy payload building) to the endpoint's transform time.
+        """
+        rows = iter(rows)
+        while True:
+            started = time.perf_counter()
+            try:
+                row = next(rows)
+            except StopIteration:
+                return
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._endpoint(method, api_url).transform_seconds += elapsed
+            yield row
+
+    def add_serialize(self, method: str, api_url: str, seconds: float):
+        with self._lock:
+            self._endpoint(method, api_url).serialize_seconds += seconds
+
+    def observe_request(self, method: str, api_url: str, started: float, seconds: float,
+                        bytes_sent: int, ok: bool, rows: int = 1):
+        """
+        One attempt: ``started`` is a ``time.perf_counter()`` timestamp.
+        """
+        with self._lock:
+            stats = self._endpoint(method, api_url)
+            stats.latencies.append(seconds)
+            stats.requests += 1
+            stats.bytes_sent += bytes_sent
+            if ok:
+                stats.rows += rows
+            else:
+                stats.errors += 1
+            if stats.first_started is None or started < stats.first_started:
+                stats.first_started = started
+            finished = started + seconds
+            if stats.last_finished is None or finished > stats.last_finished:
+                stats.last_finished = finished
+
+    def records(self) -> list:
+        """
+        Snapshot as flat dicts, one per stage and one per endpoint.
+        """
+        with self._lock:
+            records = [
+                {'type': 'stage', 'dataset': dataset, 'stage': stage, 'seconds': round(seconds, 6)}
+                for (dataset, stage), seconds in self.stages.items()
+            ]
+            records += [
+                {'type': 'endpoint', 'method': method, 'endpoint': endpoint, **stats.summary()}
+                for (method, endpoint), stats in self.endpoints.items()
+            ]
+        return records
+
+    def to_json_lines(self) -> str:
+        return ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in self.records())
+
+    def to_prometheus(self) -> str:
+        lines = ['# TYPE loader_stage_seconds gauge']
+        records = self.records()
+        for record in records:
+            if record['type'] == 'stage':
+                lines.append(f'loader_stage_seconds{{dataset="{record["dataset"]}",'
+                             f'stage="{record["stage"]}"}} {record["seconds"]}')
+
+        endpoints = [record for record in records if record['type'] == 'endpoint']
+        lines.append('# TYPE loader_request_seconds summary')
+        for record in endpoints:
+            labels = f'method="{record["method"]}",endpoint="{record["endpoint"]}"'
+            for q in QUANTILES:
+                lines.append(f'loader_request_seconds{{{labels},quantile="{q}"}} '
+                             f'{record[f"p{round(q * 100)}"]}')
+            lines.append(f'loader_request_seconds_sum{{{labels}}} {record["latency_sum"]}')
+            lines.append(f'loader_request_seconds_count{{{labels}}} {record["requests"]}')
+
+        for name, kind, key in [
+            ('loader_request_errors_total', 'counter', 'errors'),
+            ('loader_rows_total', 'counter', 'rows'),
+            ('loader_bytes_sent_total', 'counter', 'bytes_sent'),
+            ('loader_transform_seconds_total', 'counter', 'transform_seconds'),
+            ('loader_serialize_seconds_total', 'counter', 'serialize_seconds'),
+            ('loader_rows_per_second', 'gauge', 'rows_per_second'),
+        ]:
+            lines.append(f'# TYPE {name} {kind}')
+            for record in endpoints:
+                lines.append(f'{name}{{method="{record["method"]}",endpoint="{record["endpoint"]}"}} '
+                             f'{record[key]}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str):
+        """
+        Writes JSON lines, or Prometheus text for a ``.prom`` path; ``-`` is stdout.
+        """
+        text = self.to_prometheus() if path.endswith('.prom') else self.to_json_lines()
+        if path == '-':
+            sys.stdout.write(text)
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"📊 Metrics written to {path}")
+
+
+METRICS = Metrics()
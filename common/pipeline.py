@@ -0,0 +1,147 @@
+"""
+Streaming read → normalize → upload pipeline for large CSVs.
+
+``CsvSchema.read`` parses and cleans the whole file before the first
+request goes out, so the network idles while the CSV is parsed and the CPU
+idles during the upload. ``stream_csv_rows`` instead reads the file in
+chunks (``CsvSchema.iter_chunks``), cleans each chunk and builds its
+payloads in background threads, and hands the rows to the uploader while
+the next chunks are still being read:
+
+    reader thread --queue--> normalizer thread --queue--> uploader (caller)
+
+Each queue holds at most ``QUEUE_SIZE`` chunks: when the upload falls
+behind, the reader blocks instead of piling parsed rows up in memory, so
+only a few chunks are alive at a time rather than the whole frame. An
+exception in any stage is re-raised in the consuming thread, and a
+consumer that stops early stops the stages too.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from functools import partial
+from typing import TYPE_CHECKING
+
+from common.dedup import ChunkDeduper
+from common.records import iter_payloads
+
+if TYPE_CHECKING:
+    from common.schemas import CsvSchema
+
+# Large enough that per-chunk overhead stays small, small enough that the
+# first request goes out after a few milliseconds of parsing
+DEFAULT_CHUNKSIZE = 10_000
+QUEUE_SIZE = 2
+
+# How often a blocked stage checks whether the consumer has gone away
+_POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+class _Failure:
+    """
+    Carries a stage's exception downstream, to be re-raised by the consumer.
+    """
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def _put(out: queue.Queue, item, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _drain(inbox: queue.Queue, stop: threading.Event):
+    """
+    Yields a queue's items until the upstream stage is done.
+    """
+    while True:
+        try:
+            item = inbox.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            if stop.is_set():
+                return
+            continue
+        if item is _DONE:
+            return
+        if isinstance(item, _Failure):
+            raise item.exc
+        yield item
+
+
+def _run_stage(produce, out: queue.Queue, stop: threading.Event):
+    items = produce()
+    try:
+        for item in items:
+            if not _put(out, item, stop):
+                return
+    except BaseException as exc:
+        _put(out, _Failure(exc), stop)
+        return
+    finally:
+        # Lets a generator source release its file when the consumer stopped early
+        close = getattr(items, 'close', None)
+        if close is not None:
+            close()
+    _put(out, _DONE, stop)
+
+
+def pipeline(source, *stages, maxsize: int = QUEUE_SIZE):
+    """
+    Iterates ``source`` and applies each of ``stages`` (item -> item) in its
+    own thread, the threads connected by queues of ``maxsize`` items, and
+    yields the last stage's results in source order.
+    """
+    stop = threading.Event()
+    inbox = queue.Queue(maxsize)
+    threads = [threading.Thread(target=_run_stage, args=(partial(iter, source), inbox, stop), daemon=True)]
+    for stage in stages:
+        outbox = queue.Queue(maxsize)
+        produce = partial(map, stage, _drain(inbox, stop))
+        threads.append(threading.Thread(target=_run_stage, args=(produce, outbox, stop), daemon=True))
+        inbox = outbox
+
+    for thread in threads:
+        thread.start()
+    try:
+        yield from _drain(inbox, stop)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def stream_csv_rows(schema: CsvSchema, csv_path: str, fields, casts: dict = None,
+                    rename: dict = None, key_fields=None, name: str = 'rows',
+                    chunksize: int = DEFAULT_CHUNKSIZE, **read_kwargs):
+    """
+    The (idx, payload) rows of ``iter_payloads(schema.read(csv_path), ...)``,
+    read and built chunk by chunk in background threads while the caller
+    uploads them.
+
+    - rename: {CSV column: name used in ``fields``}
+    - key_fields: dedupe like ``drop_duplicate_rows`` (after ``rename``),
+      the report is printed once the rows are exhausted
+    """
+    deduper = ChunkDeduper(key_fields, name=name) if key_fields else None
+
+    def normalize(chunk):
+        chunk = schema.clean(chunk)
+        if rename:
+            chunk = chunk.rename(columns=rename)
+        if deduper:
+            chunk = deduper(chunk)
+        return list(iter_payloads(chunk, fields, casts))
+
+    for rows in pipeline(schema.iter_chunks(csv_path, chunksize, **read_kwargs), normalize):
+        yield from rows
+    if deduper:
+        deduper.report()
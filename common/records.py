@@ -0,0 +1,78 @@
+"""
+Vectorized payload building for the uploaders.
+
+Instead of ``df.iterrows()`` (one boxed Series per row) each payload column
+is coerced once for the whole frame and converted with ``Series.tolist()``,
+which also turns numpy scalars into plain Python ints/floats/strs that
+serialize to JSON directly.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def iter_payloads(df: pd.DataFrame, fields, casts: dict = None):
+    """
+    Yields (idx, payload) pairs for ``Uploader.post_rows``.
+
+    - fields: list of column names, or {payload_key: column_name}
+    - casts: {payload_key: function(Series) -> Series}, applied once per column
+    """
+    if not isinstance(fields, dict):
+        fields = {col: col for col in fields}
+    casts = casts or {}
+
+    keys = list(fields)
+    columns = []
+    for key, col in fields.items():
+        series = df[col]
+        if key in casts:
+            series = casts[key](series)
+        columns.append(series.tolist())
+
+    for idx, values in zip(df.index.tolist(), zip(*columns)):
+        yield idx, dict(zip(keys, values))
+
+
+def iter_record_payloads(records, fields):
+    """
+    ``iter_payloads`` for the (idx, record) pairs of ``CsvSchema.read_records``.
+    Values are already typed there, so there are no casts.
+    """
+    if not isinstance(fields, dict):
+        fields = {col: col for col in fields}
+    items = list(fields.items())
+    for idx, record in records:
+        yield idx, {key: getattr(record, col) for key, col in items}
+
+
+def row_key(payload: dict, key_fields) -> str:
+    """
+    Stable string key of a payload, e.g. "08.02.01|2024" for KCP.
+    """
+    return '|'.join(str(payload[field]) for field in key_fields)
+
+
+def as_int(series: pd.Series) -> pd.Series:
+    return series.astype('int64')
+
+
+def as_float(series: pd.Series) -> pd.Series:
+    return series.astype('float64')
+
+
+def as_optional(series: pd.Series) -> pd.Series:
+    """
+    Cast for columns with gaps: missing values become None (JSON null).
+    """
+    return series.astype(object).where(series.notna(), None)
+
+
+def rounded(digits: int):
+    """
+    Cast for float columns that the API expects rounded, e.g. rounded(3).
+    """
+    return lambda series: series.astype('float64').round(digits)
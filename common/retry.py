@@ -0,0 +1,248 @@
+"""
+Retry, backoff and congestion control shared by both upload engines.
+
+A transient 502/503/429 from the hosted API used to lose the row. Now:
+
+- ``RetryPolicy`` decides which failures are worth resending (connection
+  errors and the statuses a server returns before doing any work) and how
+  long to wait: full-jitter exponential backoff, or the server's
+  ``Retry-After`` when it sends one.
+- ``AimdLimit`` adapts the number of requests in flight: halved on 429/5xx
+  (at most once per cooldown), grown by one per window of successes, like
+  TCP congestion control. ``ConcurrencyGate`` enforces it for threads.
+- ``DeadLetterFile`` keeps rows that still failed as JSON lines, so they
+  can be replayed later with ``python -m common.retry <file>``.
+"""
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Statuses a server sends before (or instead of) processing the request
+RETRY_STATUSES = frozenset({408, 425, 429, 502, 503, 504})
+
+DEFAULT_DEAD_LETTER = 'failed_rows.jsonl'
+
+
+def is_congestion(status) -> bool:
+    """
+    Signals that should slow the sender down: 429, any 5xx, or no response.
+    """
+    return status is None or status == 429 or status >= 500
+
+
+def parse_retry_after(value) -> float:
+    """
+    ``Retry-After`` header as seconds to wait (delta-seconds or HTTP-date), or None.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    - max_attempts: tries per request, including the first one
+    - base_delay / max_delay: exponential backoff bounds in seconds
+    - retry_statuses: response statuses that are resent
+    """
+    max_attempts: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    retry_statuses: frozenset = RETRY_STATUSES
+
+    def is_transient(self, status=None) -> bool:
+        """
+        ``status`` is None for a connection error or timeout.
+        """
+        return status is None or status in self.retry_statuses
+
+    def should_retry(self, attempt: int, status=None) -> bool:
+        """
+        ``attempt`` counts from 1.
+        """
+        return attempt < self.max_attempts and self.is_transient(status)
+
+    def backoff(self, attempt: int, retry_after: float = None) -> float:
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class AimdLimit:
+    """
+    Additive-increase / multiplicative-decrease limit on requests in flight,
+    between ``minimum`` and ``maximum`` (the configured concurrency).
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1, decrease: float = 0.5,
+                 cooldown: float = 1.0):
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.limit = float(self.maximum)
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> int:
+        return int(self.limit)
+
+    def on_success(self):
+        with self._lock:
+            if self.limit < self.maximum:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_congestion(self, reason: str, retry_after: float = None):
+        now = time.monotonic()
+        with self._lock:
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+            # One burst of failures from the same window counts as one signal
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            before = self.current
+            self.limit = max(self.minimum, self.limit * self.decrease)
+        if self.current < before:
+            print(f"🐢 {reason}: concurrency {before} → {self.current}")
+
+    def pause_remaining(self) -> float:
+        return max(0.0, self.paused_until - time.monotonic())
+
+
+class ConcurrencyGate:
+    """
+    Blocks threads while ``limit.current`` requests are already in flight
+    or the server asked to pause (``Retry-After``).
+    """
+
+    def __init__(self, limit: AimdLimit):
+        self.limit = limit
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        with self._cond:
+            while True:
+                pause = self.limit.pause_remaining()
+                if pause == 0 and self.in_flight < self.limit.current:
+                    break
+                self._cond.wait(timeout=pause or 0.1)
+            self.in_flight += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+
+class DeadLetterFile:
+    """
+    Append-only JSON lines of rows that failed for good. The file is only
+    created when the first row fails; safe to share between threads.
+    """
+
+    def __init__(self, path=DEFAULT_DEAD_LETTER):
+        self.path = Path(path)
+        self.count = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def write(self, api_url: str, idx, payload, reason: str, method: str = 'POST',
+              expected_status: int = 201):
+        entry = {
+            'api_url': api_url,
+            'method': method,
+            'expected_status': expected_status,
+            'idx': idx if isinstance(idx, (int, str)) else str(idx),
+            'payload': payload,
+            'reason': reason,
+            'failed_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                print(f"📮 {self.count} failed rows saved to {self.path} "
+                      f"(replay: python -m common.retry {self.path})")
+
+
+def read_dead_letters(path) -> list:
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def replay_dead_letters(path, uploader):
+    """
+    Re-sends every row of a dead-letter file. The file is moved aside first,
+    so rows that fail again land in the uploader's dead-letter file anew.
+    The moved copy is deleted only once every row has been handed to the
+    uploader: if a replay was interrupted, the next run resends that copy
+    and leaves ``path`` for the run after it.
+    """
+    path = Path(path)
+    replaying = path.with_name(path.name + '.replaying')
+    if replaying.exists():
+        print(f"⚠️ Resuming the interrupted replay of {replaying}; "
+              f"{path} is left for the next run")
+    else:
+        path.replace(replaying)
+    entries = read_dead_letters(replaying)
+
+    success_count = 0
+    groups = {}
+    for entry in entries:
+        if entry['method'] == 'PUT':
+            success_count += uploader.put(entry['api_url'], entry['payload'], entry['idx'],
+                                          entry['expected_status'])
+        else:
+            groups.setdefault((entry['api_url'], entry['expected_status']), []).append(
+                (entry['idx'], entry['payload']))
+    for (api_url, expected_status), rows in groups.items():
+        success_count += uploader.post_rows(api_url, rows, expected_status).success_count
+
+    replaying.unlink()
+    print(f"\n✅ Replayed: {success_count} of {len(entries)} rows")
+
+
+def main(argv=None):
+    from common.cli import loader_parser, uploader_from_args
+
+    parser = loader_parser("Replay rows saved to a dead-letter file")
+    parser.add_argument('path', help='dead-letter file written by an earlier upload')
+    args = parser.parse_args(argv)
+    with uploader_from_args(args) as uploader:
+        replay_dead_letters(args.path, uploader)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Declarative parser for Rosstat statistical workbooks.
+
+A workbook sheet is described by a ``SheetLayout`` (header row, id column,
+year range, number of data rows, normalization rules). The layout is
+compiled once into an ``ExtractionPlan`` that reads only the needed block
+with a single ``pd.read_excel`` call (``skiprows``/``nrows``/``usecols``)
+and melts it into the long format the loaders upload:
+
+    [<id_column>, year, <value_column>]
+
+New workbooks are onboarded by adding a layout, not a new script.
+"""
+from __future__ import annotations
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from common.frame_cache import cached_frame
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+@dataclass(frozen=True)
+class SheetLayout:
+    """
+    - sheet: sheet name, matched case-insensitively
+    - header: row with the column captions (as ``header=`` of pd.read_excel)
+    - id_column: name given to the first column (group / category)
+    - value_column: name of the melted value column
+    - first_year, last_year: years in columns 1..N, left to right
+    - n_rows: data rows under the header (rows below are notes / percentages)
+    - normalize: ((regex, replacement), ...) applied to the id column
+    - capitalize: upper-case the first letter of every id
+    """
+    sheet: str
+    header: int
+    id_column: str
+    value_column: str
+    first_year: int
+    last_year: int
+    n_rows: int
+    normalize: tuple = ()
+    capitalize: bool = False
+
+    @property
+    def years(self) -> list:
+        return [str(year) for year in range(self.first_year, self.last_year + 1)]
+
+
+@dataclass(frozen=True)
+class ExtractionPlan:
+    layout: SheetLayout
+    read_kwargs: dict
+    rules: tuple
+
+    def extract(self, source) -> pd.DataFrame:
+        """
+        Reads the planned block from ``source`` (path or pd.ExcelFile).
+        """
+        import pandas as pd
+
+        layout = self.layout
+        df = pd.read_excel(source, sheet_name=self.sheet_name(source), **self.read_kwargs)
+
+        for pattern, replacement in self.rules:
+            df[layout.id_column] = df[layout.id_column].replace(regex=pattern, value=replacement)
+
+        df_long = df.melt(
+            id_vars=layout.id_column,
+            value_vars=layout.years,
+            var_name="year",
+            value_name=layout.value_column
+        )
+        df_long["year"] = df_long["year"].astype(int)
+        df_long[layout.value_column] = df_long[layout.value_column].astype(float)
+        if layout.capitalize:
+            df_long[layout.id_column] = df_long[layout.id_column].str.capitalize()
+        return df_long
+
+    def sheet_name(self, source) -> str:
+        import pandas as pd
+
+        if isinstance(source, pd.ExcelFile):
+            for name in source.sheet_names:
+                if name.lower() == self.layout.sheet.lower():
+                    return name
+        return self.layout.sheet
+
+
+@lru_cache(maxsize=None)
+def compile_layout(layout: SheetLayout) -> ExtractionPlan:
+    years = layout.years
+    read_kwargs = {
+        'header': None,
+        'skiprows': layout.header + 1,
+        'nrows': layout.n_rows,
+        'usecols': list(range(len(years) + 1)),
+        'names': [layout.id_column, *years],
+    }
+    rules = tuple((re.compile(pattern), replacement) for pattern, replacement in layout.normalize)
+    return ExtractionPlan(layout, read_kwargs, rules)
+
+
+@cached_frame
+def parse_workbook(file_path, layouts) -> pd.DataFrame:
+    """
+    Extracts every layout's sheet from one workbook and concatenates them.
+    Sheets missing from the workbook are skipped.
+    """
+    import pandas as pd
+
+    xls = pd.ExcelFile(file_path)
+    available = {name.lower() for name in xls.sheet_names}
+    data_frames = [
+        compile_layout(layout).extract(xls)
+        for layout in layouts
+        if layout.sheet.lower() in available
+    ]
+    return pd.concat(data_frames, ignore_index=True)
+
+
+def _extract_task(task):
+    import pandas as pd
+
+    file_path, layout = task
+    plan = compile_layout(layout)
+    xls = pd.ExcelFile(file_path)
+    if plan.sheet_name(xls) not in xls.sheet_names:
+        return None
+    df_long = plan.extract(xls)
+    df_long["source_file"] = Path(file_path).name
+    return df_long
+
+
+def parse_workbooks(sources, layouts, workers: int = None) -> pd.DataFrame:
+    """
+    Parses many workbooks at once. ``sources`` is a list of files and/or
+    directories (every *.xlsx inside is taken). Each (file, sheet) pair is
+    parsed in its own process; results are concatenated in sorted file
+    order, then layout order, regardless of which worker finishes first.
+    Adds a source_file column so regions can be told apart.
+    """
+    import pandas as pd
+
+    files = []
+    for source in sources:
+        source = Path(source)
+        files.extend(sorted(source.glob('*.xlsx')) if source.is_dir() else [source])
+
+    tasks = [(str(file_path), layout) for file_path in files for layout in layouts]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        data_frames = [df for df in pool.map(_extract_task, tasks) if df is not None]
+    return pd.concat(data_frames, ignore_index=True)
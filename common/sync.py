@@ -0,0 +1,86 @@
+"""
+Incremental diff sync against the API instead of blind re-posting.
+
+The server's current records are fetched page by page, indexed by the same
+row key the checkpoint journal uses, and compared with the local payloads:
+only new rows are POSTed and only rows whose fields changed are PUT to
+``<api_url>/<id>``. Reference datasets that change by a handful of rows per
+release then sync with a few requests instead of thousands.
+"""
+from dataclasses import dataclass, field
+
+from common.records import row_key
+from common.uploader import UploadResult, Uploader, upload_rows
+
+
+@dataclass
+class SyncDiff:
+    new_rows: list = field(default_factory=list)       # (idx, payload)
+    changed_rows: list = field(default_factory=list)   # (idx, payload, remote_id)
+    unchanged: int = 0
+
+
+def fetch_all(uploader, api_url: str, page_size: int = 500) -> list:
+    """
+    GETs every record from a FastAPI list endpoint using skip/limit paging.
+    Stops on a short page, or when the server ignores paging and repeats itself.
+    """
+    records = []
+    skip = 0
+    while True:
+        page = uploader.get_json(api_url, params={'skip': skip, 'limit': page_size})
+        if not page or (records and page[0] == records[0]):
+            break
+        records.extend(page)
+        if len(page) < page_size:
+            break
+        skip += page_size
+    return records
+
+
+def diff_records(rows, remote: list, key_fields, id_field: str = 'id') -> SyncDiff:
+    """
+    Compares local (idx, payload) rows with remote records by key.
+    A row counts as changed when any of its payload fields differs.
+    """
+    remote_by_key = {}
+    for record in remote:
+        try:
+            remote_by_key[row_key(record, key_fields)] = record
+        except KeyError:
+            continue
+
+    diff = SyncDiff()
+    for idx, payload in rows:
+        record = remote_by_key.get(row_key(payload, key_fields))
+        if record is None:
+            diff.new_rows.append((idx, payload))
+        elif any(record.get(name) != value for name, value in payload.items()):
+            diff.changed_rows.append((idx, payload, record[id_field]))
+        else:
+            diff.unchanged += 1
+    return diff
+
+
+def sync_rows(api_url: str, rows, key_fields, uploader: Uploader = None,
+              id_field: str = 'id', page_size: int = 500) -> UploadResult:
+    """
+    Brings the endpoint in line with ``rows``: POSTs new rows, PUTs changed ones.
+    """
+    own_uploader = uploader is None
+    if own_uploader:
+        uploader = Uploader()
+
+    try:
+        remote = fetch_all(uploader, api_url, page_size)
+        diff = diff_records(rows, remote, key_fields, id_field)
+        print(f"🔄 Sync: {len(diff.new_rows)} new, {len(diff.changed_rows)} changed, "
+              f"{diff.unchanged} unchanged (server has {len(remote)})")
+
+        result = upload_rows(api_url, diff.new_rows, uploader)
+        for idx, payload, remote_id in diff.changed_rows:
+            result.record(idx, uploader.put(f"{api_url.rstrip('/')}/{remote_id}", payload, idx))
+        return result
+    finally:
+        if own_uploader:
+            uploader.close()
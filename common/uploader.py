@@ -0,0 +1,301 @@
+"""
+Shared HTTP uploader used by all dataset loaders.
+
+One keep-alive ``requests.Session`` is reused for every row, with a
+connection pool sized per host, and rows are posted from a small thread pool
+so a full dataset push does not open a new TCP/TLS connection per row.
+
+With ``batch_size`` > 1 rows are sent in chunks as a single JSON array; a
+chunk the server rejects is re-sent row by row so the failing row index is
+still reported.
+
+Transient failures are retried with backoff and the number of requests in
+flight adapts to 429/5xx responses (see ``common.retry``); rows that still
+fail are written to a dead-letter file for replay. Every POST/PUT carries
+an ``Idempotency-Key`` derived from its body (see ``common.dedup``), so a
+retried request is not stored twice. Request latency, bytes and payload
+encoding time are recorded in ``common.metrics.METRICS``.
+"""
+from __future__ import annotations
+
+import json
+import time
+from itertools import islice
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from common.dedup import IDEMPOTENCY_HEADER, idempotency_key
+from common.metrics import METRICS
+from common.retry import (AimdLimit, ConcurrencyGate, DeadLetterFile, RetryPolicy,
+                          is_congestion, parse_retry_after)
+
+DEFAULT_HEADERS = {'Content-Type': 'application/json'}
+
+
+@dataclass
+class UploadResult:
+    """
+    Per-row accounting of an upload, same counters the loaders used to print.
+    """
+    success_count: int = 0
+    fail_count: int = 0
+    failed_rows: list = field(default_factory=list)
+
+    def record(self, idx, ok: bool):
+        if ok:
+            self.success_count += 1
+        else:
+            self.fail_count += 1
+            self.failed_rows.append(idx)
+
+
+def iter_batches(rows, batch_size: int):
+    """
+    Yields lists of up to ``batch_size`` (idx, payload) pairs.
+    """
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class Uploader:
+    """
+    Posts JSON payloads through a pooled keep-alive session.
+
+    - concurrency: number of requests in flight at once
+    - pool_maxsize: connections kept open per host (defaults to concurrency)
+    - pool_connections: number of distinct hosts to keep pools for
+    - batch_size: rows per request, sent as a JSON array when > 1
+    - retry: ``RetryPolicy`` for transient failures (default: 5 attempts)
+    - dead_letter: file for rows that failed for good, or None
+    """
+
+    def __init__(self, concurrency: int = 8, pool_maxsize: int = None,
+                 pool_connections: int = 4, timeout: float = 30.0, headers: dict = None,
+                 batch_size: int = 1, retry: RetryPolicy = None, dead_letter=None):
+        # Imported here so scripts answer --help without loading requests
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size)
+        self.retry = retry or RetryPolicy()
+        self.limit = AimdLimit(self.concurrency)
+        self.gate = ConcurrencyGate(self.limit)
+        self.dead_letter = DeadLetterFile(dead_letter) if dead_letter else None
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize or self.concurrency,
+            pool_block=True,
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+        if self.dead_letter is not None:
+            self.dead_letter.close()
+
+    def request(self, method: str, api_url: str, payload=None, params: dict = None,
+                expected_status: int = None, rows: int = 1):
+        """
+        Sends one request through the concurrency gate, retrying transient
+        failures. Returns ``(response, error)`` of the last attempt: the
+        response is None when it ended in a connection error or timeout,
+        or when the payload is not valid JSON (e.g. NaN; never retried).
+        Requests with a body carry an ``Idempotency-Key``, the same on every attempt.
+        """
+        body = None
+        headers = None
+        if payload is not None:
+            started = time.perf_counter()
+            try:
+                body = json.dumps(payload, allow_nan=False).encode()
+            except ValueError as e:
+                return None, e
+            headers = {IDEMPOTENCY_HEADER: idempotency_key(method, api_url, body)}
+            METRICS.add_serialize(method, api_url, time.perf_counter() - started)
+
+        from requests import RequestException
+
+        attempt = 0
+        while True:
+            attempt += 1
+            response, error = None, None
+            with self.gate:
+                started = time.perf_counter()
+                try:
+                    response = self.session.request(method, api_url, data=body, params=params,
+                                                    headers=headers, timeout=self.timeout)
+                except RequestException as e:
+                    error = e
+                elapsed = time.perf_counter() - started
+
+            status = None if response is None else response.status_code
+            ok = status is not None and (status == expected_status
+                                         or expected_status is None and status < 400)
+            METRICS.observe_request(method, api_url, started, elapsed, len(body or b''), ok, rows)
+            if ok:
+                self.limit.on_success()
+                return response, None
+
+            retry_after = None if response is None else parse_retry_after(response.headers.get('Retry-After'))
+            if is_congestion(status):
+                self.limit.on_congestion(f"Status {status}" if status else type(error).__name__, retry_after)
+            if not self.retry.should_retry(attempt, status):
+                return response, error
+            time.sleep(self.retry.backoff(attempt, retry_after))
+
+    def put(self, api_url: str, payload, idx=None, expected_status: int = 200) -> bool:
+        return self._send(api_url, idx, payload, expected_status, method='PUT')
+
+    def post_json(self, api_url: str, payload, idx=None, expected_status: int = 201):
+        """
+        POSTs one row and returns the decoded response (the created record),
+        or None when the row failed for good.
+        """
+        response = self._send_row(api_url, idx, payload, expected_status)
+        return None if response is None else response.json()
+
+    def get_json(self, api_url: str, params: dict = None):
+        response, error = self.request('GET', api_url, params=params)
+        if response is None:
+            raise error
+        response.raise_for_status()
+        return response.json()
+
+    def _give_up(self, api_url: str, rows: list, reason: str, method: str, expected_status: int):
+        if self.dead_letter is not None:
+            for idx, payload in rows:
+                self.dead_letter.write(api_url, idx, payload, reason, method, expected_status)
+
+    def _send(self, api_url: str, idx, payload, expected_status: int, method: str = 'POST') -> bool:
+        return self._send_row(api_url, idx, payload, expected_status, method) is not None
+
+    def _send_row(self, api_url: str, idx, payload, expected_status: int, method: str = 'POST'):
+        """
+        Returns the accepted response, or None once the row is given up on.
+        """
+        response, error = self.request(method, api_url, payload, expected_status=expected_status)
+        if response is None:
+            reason = f"Exception occurred — {error}"
+        elif response.status_code != expected_status:
+            reason = f"Status {response.status_code}, Response: {response.text}"
+        else:
+            return response
+        print(f"❌ Row {idx}: {reason}")
+        self._give_up(api_url, [(idx, payload)], reason, method, expected_status)
+        return None
+
+    def _send_batch(self, api_url: str, batch: list, expected_status: int) -> list:
+        if self.batch_size == 1:
+            return [self._send(api_url, idx, payload, expected_status) for idx, payload in batch]
+
+        response, error = self.request('POST', api_url, [payload for _, payload in batch],
+                                       expected_status=expected_status, rows=len(batch))
+        if response is not None and response.status_code == expected_status:
+            return [True] * len(batch)
+
+        status = None if response is None else response.status_code
+        reason = f"Exception occurred — {error}" if response is None else f"Status {status}"
+        if self.retry.is_transient(status) and not isinstance(error, ValueError):
+            # Retries are used up on a transient error: row by row would only repeat them
+            print(f"❌ Rows {batch[0][0]}..{batch[-1][0]}: {reason}, "
+                  f"gave up after {self.retry.max_attempts} attempts")
+            self._give_up(api_url, batch, reason, 'POST', expected_status)
+            return [False] * len(batch)
+
+        print(f"↩️ Batch of rows {batch[0][0]}..{batch[-1][0]} rejected ({reason}), retrying row by row")
+        return [self._send(api_url, idx, payload, expected_status) for idx, payload in batch]
+
+    def post_rows(self, api_url: str, rows, expected_status: int = 201,
+                  on_success=None) -> UploadResult:
+        """
+        Posts every (idx, payload) pair from ``rows`` and returns the counts.
+        At most ``concurrency`` requests are in flight; rows are consumed lazily.
+        ``on_success(payload)`` is called for every accepted row.
+        """
+        result = UploadResult()
+        rows = METRICS.timed_rows(rows, 'POST', api_url)
+
+        def record(batch, oks):
+            for (idx, payload), ok in zip(batch, oks):
+                result.record(idx, ok)
+                if ok and on_success is not None:
+                    on_success(payload)
+
+        batches = iter_batches(rows, self.batch_size)
+
+        if self.concurrency == 1:
+            for batch in batches:
+                record(batch, self._send_batch(api_url, batch, expected_status))
+            return result
+
+        # Collected in completion order: a batch sleeping in backoff must not
+        # hold back the submission of the ones behind it
+        pending = {}
+
+        def collect(return_when):
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                record(pending.pop(future), future.result())
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for batch in batches:
+                pending[pool.submit(self._send_batch, api_url, batch, expected_status)] = batch
+                if len(pending) >= self.concurrency * 2:
+                    collect(FIRST_COMPLETED)
+            collect(ALL_COMPLETED)
+        return result
+
+
+def upload_rows(api_url: str, rows, uploader: Uploader = None, expected_status: int = 201,
+                journal=None) -> UploadResult:
+    """
+    Posts rows with the given uploader, or with a temporary default one.
+    With a ``CheckpointJournal`` rows already accepted by ``api_url`` are
+    skipped and newly accepted ones are recorded.
+    """
+    on_success = None
+    if journal is not None:
+        rows = journal.pending(api_url, rows)
+        on_success = lambda payload: journal.mark(api_url, payload)
+
+    if uploader is not None:
+        result = uploader.post_rows(api_url, rows, expected_status, on_success)
+    else:
+        with Uploader() as own_uploader:
+            result = own_uploader.post_rows(api_url, rows, expected_status, on_success)
+
+    if journal is not None and journal.skipped:
+        print(f"⏭️ Skipped {journal.skipped} rows already uploaded (journal: {journal.path})")
+    return result
+
+
+def make_uploader(use_async: bool = False, concurrency: int = None, **kwargs):
+    """
+    Returns the thread-pool ``Uploader`` or, with ``use_async``, the asyncio
+    ``AsyncUploader`` (imported lazily, it needs aiohttp).
+    """
+    if concurrency is not None:
+        kwargs['concurrency'] = concurrency
+    if use_async:
+        from common.async_uploader import AsyncUploader
+        return AsyncUploader(**kwargs)
+    return Uploader(**kwargs)
@@ -0,0 +1,3 @@
+"""
+fgos loader, importable as ``fgos.main`` or run as ``python -m fgos.main``.
+"""
@@ -1,5 +1,27 @@
-import pandas as pd
-import requests
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.checkpoint import CheckpointJournal
+from common.cli import journal_from_args, loader_parser, uploader_from_args, write_metrics
+from common.dedup import drop_duplicate_rows
+from common.metrics import METRICS
+from common.records import iter_payloads, iter_record_payloads
+from common.schemas import MIB, STRING, CsvSchema
+from common.sync import sync_rows
+from common.uploader import Uploader, upload_rows
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Payload fields identifying a row (checkpoint journal and --sync diff)
+FGOS_KEY = ["fgos_code"]
+
+FGOS_SCHEMA = CsvSchema({"fgos_code": STRING, "fgos_name": STRING, "fgos_prikaz": STRING},
+                        memory_budget=MIB // 4)
 
 def load_fgos_csv(csv_path: str) -> pd.DataFrame:
     """
@@ -8,14 +30,19 @@ def load_fgos_csv(csv_path: str) -> pd.DataFrame:
     - fgos_name
     - fgos_prikaz
     """
-    df = pd.read_csv(csv_path, encoding='utf-8')
-    df.dropna(subset=['fgos_code', 'fgos_name', 'fgos_prikaz'], inplace=True)
-    df = df.astype(str).apply(lambda col: col.str.strip())  # Clean whitespace
-    return df
+    return FGOS_SCHEMA.read(csv_path)
 
-def send_fgos_to_api(df: pd.DataFrame, api_url: str):
+def load_fgos_records(csv_path: str) -> list:
+    """
+    Same as load_fgos_csv without pandas: (idx, record) pairs.
+    """
+    return FGOS_SCHEMA.read_records(csv_path)
+
+def send_fgos_to_api(df: pd.DataFrame, api_url: str, uploader: Uploader = None,
+                     journal: CheckpointJournal = None, sync: bool = False):
     """
     Sends each FGOS row to the specified FastAPI endpoint using POST.
+    ``df`` is the load_fgos_csv frame or the load_fgos_records list.
     Expected payload:
     {
         "fgos_code": str,
@@ -23,42 +50,46 @@ def send_fgos_to_api(df: pd.DataFrame, api_url: str):
         "fgos_prikaz": str
     }
     """
-    headers = {'Content-Type': 'application/json'}
-    success_count = 0
-    fail_count = 0
-
-    for idx, row in df.iterrows():
-        payload = {
-            "fgos_code": row["fgos_code"],
-            "fgos_name": row["fgos_name"],
-            "fgos_prikaz": row["fgos_prikaz"]
-        }
-
-        try:
-            response = requests.post(api_url, json=payload, headers=headers)
-            if response.status_code == 201:
-                success_count += 1
-            else:
-                fail_count += 1
-                print(f"❌ Row {idx}: Status {response.status_code}, Response: {response.text}")
-        except requests.RequestException as e:
-            fail_count += 1
-            print(f"❌ Row {idx}: Exception occurred — {e}")
-
-    print(f"\n✅ Uploaded: {success_count} records")
-    if fail_count:
-        print(f"⚠️ Failed: {fail_count} records")
+    fields = ["fgos_code", "fgos_name", "fgos_prikaz"]
+    rows = iter_record_payloads(df, fields) if isinstance(df, list) else iter_payloads(df, fields)
+    if sync:
+        result = sync_rows(api_url, rows, FGOS_KEY, uploader)
+    else:
+        result = upload_rows(api_url, rows, uploader, journal=journal)
+
+    print(f"\n✅ Uploaded: {result.success_count} records")
+    if result.fail_count:
+        print(f"⚠️ Failed: {result.fail_count} records")
 
 
 # Step 1: CSV file path
-csv_file_path = "fgos.csv"
+csv_file_path = str(Path(__file__).with_name("fgos.csv"))
 
 # Step 2: Your FastAPI endpoint
 api_endpoint = "http://localhost:8000/api/fgos-dataset/"
 
-# Step 3: Load the CSV
-fgos_df = load_fgos_csv(csv_file_path)
-print(f"Loaded {len(fgos_df)} FGOS records.\n")
 
-# Step 4: Send to API
-send_fgos_to_api(fgos_df, api_endpoint)
+def main(argv=None):
+    # Command-line flags (see common.cli.loader_parser)
+    parser = loader_parser("Upload the FGOS dataset")
+    parser.add_argument('--no-pandas', action='store_true',
+                        help='read the CSV with the csv module instead of pandas (faster start for small files)')
+    args = parser.parse_args(argv)
+
+    # Step 3: Load the CSV
+    with METRICS.stage("fgos", "load"):
+        fgos_df = load_fgos_records(csv_file_path) if args.no_pandas else load_fgos_csv(csv_file_path)
+    print(f"Loaded {len(fgos_df)} FGOS records.\n")
+    with METRICS.stage("fgos", "dedupe"):
+        fgos_df = drop_duplicate_rows(fgos_df, FGOS_KEY, name="FGOS")
+
+    # Step 4: Send to API
+    with uploader_from_args(args) as uploader, \
+            journal_from_args(args, csv_file_path, FGOS_KEY) as journal, \
+            METRICS.stage("fgos", "upload"):
+        send_fgos_to_api(fgos_df, api_endpoint, uploader, journal, sync=args.sync)
+    write_metrics(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+hr loader, importable as ``hr.main`` or run as ``python -m hr.main``.
+"""
@@ -1,14 +1,45 @@
-import pandas as pd
-import requests
+from __future__ import annotations
 
-def load_and_aggregate(csv_path: str) -> pd.DataFrame:
+import json
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.checkpoint import CheckpointJournal
+from common.cli import journal_from_args, loader_parser, uploader_from_args, write_metrics
+from common.metrics import METRICS
+from common.records import as_int, iter_payloads
+from common.sync import sync_rows
+from common.uploader import UploadResult, Uploader, upload_rows
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Payload fields identifying a row (checkpoint journal and --sync diff)
+VACANCIES_KEY = ["entry_date", "professional_role"]
+
+# Columns needed for the aggregation; everything else in the dump is skipped
+AGGREGATE_COLUMNS = ['entry_date', 'professional_roles_name']
+
+# Partial counts are merged after this many chunks to keep memory bounded
+MERGE_EVERY = 16
+
+
+def load_and_aggregate(csv_path: str, chunksize: int = None) -> pd.DataFrame:
     """
     Loads the CSV, groups by entry_date and professional_roles_name,
     and returns a DataFrame with columns:
       - entry_date
       - professional_role
       - vacancies_num
+    With ``chunksize`` the CSV is streamed (see aggregate_in_chunks).
     """
+    import pandas as pd
+
+    if chunksize:
+        return aggregate_in_chunks(csv_path, chunksize)
+
     # Read the CSV
     df = pd.read_csv(csv_path, parse_dates=['entry_date'], dayfirst=True)
     
@@ -30,47 +61,286 @@ def load_and_aggregate(csv_path: str) -> pd.DataFrame:
     
     return grouped
 
-def send_data_to_api(df: pd.DataFrame, api_url: str):
+
+def _merge_counts(parts: list) -> pd.Series:
+    import pandas as pd
+
+    return pd.concat(parts).groupby(level=[0, 1], observed=True).sum()
+
+
+def count_chunks(chunks) -> pd.Series:
+    """
+    Sums (raw entry_date, professional_roles_name) counts over DataFrame chunks.
+    """
+    import pandas as pd
+
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk.groupby(AGGREGATE_COLUMNS, observed=True).size())
+        if len(parts) >= MERGE_EVERY:
+            parts = [_merge_counts(parts)]
+    if not parts:
+        index = pd.MultiIndex.from_arrays([[], []], names=AGGREGATE_COLUMNS)
+        return pd.Series([], index=index, dtype='int64')
+    return _merge_counts(parts)
+
+
+def finalize_counts(counts: pd.Series) -> pd.DataFrame:
+    """
+    Turns raw-date counts into the load_and_aggregate output. Dates are parsed
+    once per unique value and raw spellings of the same day are merged.
+    """
+    import pandas as pd
+
+    counts = counts.reset_index(name='vacancies_num')
+    raw_dates = counts['entry_date'].unique()
+    parsed = pd.Series(pd.to_datetime(raw_dates, dayfirst=True), index=raw_dates)
+    counts['entry_date'] = counts['entry_date'].map(parsed)
+
+    grouped = (
+        counts
+        .groupby(['entry_date', 'professional_roles_name'], observed=True)['vacancies_num']
+        .sum()
+        .reset_index()
+        .rename(columns={'professional_roles_name': 'professional_role'})
+    )
+    grouped['professional_role'] = grouped['professional_role'].astype(str)
+    grouped['entry_date'] = grouped['entry_date'].dt.strftime('%Y-%m-%d')
+    return grouped
+
+
+def aggregate_in_chunks(csv_path: str, chunksize: int = 500_000) -> pd.DataFrame:
+    """
+    Streaming version of load_and_aggregate for multi-gigabyte dumps: reads
+    only the two needed columns in chunks (role names as categoricals, dates
+    kept raw) and merges partial group counts, so memory stays bounded by
+    the chunk size and the number of distinct (date, role) pairs.
+    """
+    import pandas as pd
+
+    chunks = pd.read_csv(
+        csv_path,
+        usecols=AGGREGATE_COLUMNS,
+        dtype={'entry_date': str, 'professional_roles_name': 'category'},
+        chunksize=chunksize,
+    )
+    return finalize_counts(count_chunks(chunks))
+
+
+def _state_paths(csv_path: str):
+    csv_path = Path(csv_path)
+    return (csv_path.with_name(csv_path.name + '.watermark.json'),
+            csv_path.with_name(csv_path.name + '.counts.csv'),
+            csv_path.with_name(csv_path.name + '.ids.json'))
+
+
+def _rows_from_watermark(chunks, watermark: pd.Timestamp):
+    """
+    Drops rows dated before the watermark; each raw date string is parsed once.
+    """
+    import pandas as pd
+
+    parsed = {}
+    for chunk in chunks:
+        for raw in chunk['entry_date'].unique():
+            if raw not in parsed:
+                parsed[raw] = pd.to_datetime(raw, dayfirst=True)
+        if watermark is None:
+            yield chunk
+        else:
+            yield chunk[chunk['entry_date'].map(parsed) >= watermark]
+
+
+def aggregate_incremental(csv_path: str, chunksize: int = 500_000):
+    """
+    Incremental version of aggregate_in_chunks for daily runs.
+
+    The last aggregated entry_date (the watermark) and the counts of earlier
+    dates are kept next to the CSV. A run only groups rows dated on or after
+    the watermark (the watermark day itself may have been partial) and
+    returns (all_counts, changed_counts); only the latter needs uploading.
+    Nothing is written here: pass all_counts to save_incremental_state once
+    the upload went through, or the next run would skip the unsent dates.
+    Assumes new dumps only add recent dates, as the hh.ru exports do.
+    """
+    import pandas as pd
+
+    watermark_path, counts_path, _ = _state_paths(csv_path)
+
+    watermark = None
+    cached = None
+    if watermark_path.exists() and counts_path.exists():
+        watermark = json.loads(watermark_path.read_text(encoding='utf-8'))['entry_date']
+        cached = pd.read_csv(counts_path, dtype={'entry_date': str, 'professional_role': str})
+        cached = cached[cached['entry_date'] < watermark]
+
+    chunks = pd.read_csv(
+        csv_path,
+        usecols=AGGREGATE_COLUMNS,
+        dtype={'entry_date': str, 'professional_roles_name': 'category'},
+        chunksize=chunksize,
+    )
+    changed = finalize_counts(count_chunks(
+        _rows_from_watermark(chunks, pd.Timestamp(watermark) if watermark else None)
+    ))
+
+    parts = [changed] if cached is None else [cached, changed]
+    grouped = (
+        pd.concat(parts, ignore_index=True)
+        .sort_values(['entry_date', 'professional_role'])
+        .reset_index(drop=True)
+    )
+    return grouped, changed
+
+def save_incremental_state(csv_path: str, grouped: pd.DataFrame):
+    """
+    Stores the counts and watermark returned by aggregate_incremental and
+    forgets the row ids of days before the new watermark.
+    """
+    if not len(grouped):
+        return
+    watermark_path, counts_path, _ = _state_paths(csv_path)
+    watermark = grouped['entry_date'].max()
+    grouped.to_csv(counts_path, index=False)
+    watermark_path.write_text(json.dumps({'entry_date': watermark}), encoding='utf-8')
+    row_ids = load_row_ids(csv_path)
+    save_row_ids(csv_path, {day: rows for day, rows in row_ids.items() if day >= watermark})
+
+def load_row_ids(csv_path: str) -> dict:
+    """
+    Server ids of the rows send_incremental posted one by one:
+    {entry_date: {professional_role: {'id': ..., 'vacancies_num': ...}}}
+    """
+    ids_path = _state_paths(csv_path)[2]
+    if not ids_path.exists():
+        return {}
+    return json.loads(ids_path.read_text(encoding='utf-8'))
+
+def save_row_ids(csv_path: str, row_ids: dict):
+    _state_paths(csv_path)[2].write_text(json.dumps(row_ids, ensure_ascii=False), encoding='utf-8')
+
+def vacancy_payloads(df: pd.DataFrame):
+    return iter_payloads(
+        df,
+        ["entry_date", "professional_role", "vacancies_num"],
+        casts={"vacancies_num": as_int}
+    )
+
+def send_data_to_api(df: pd.DataFrame, api_url: str, uploader: Uploader = None,
+                     journal: CheckpointJournal = None, sync: bool = False):
     """
     Sends each row of the DataFrame to the specified FastAPI endpoint using POST.
     Expects the API to accept JSON with fields:
       - entry_date (str, YYYY-MM-DD)
       - professional_role (str)
       - vacancies_num (int)
+    Returns the UploadResult.
+    """
+    rows = vacancy_payloads(df)
+    if sync:
+        result = sync_rows(api_url, rows, VACANCIES_KEY, uploader)
+    else:
+        result = upload_rows(api_url, rows, uploader, journal=journal)
+
+    print(f"\n✅ Sent {result.success_count} rows successfully.")
+    if result.fail_count:
+        print(f"⚠️ Failed to send {result.fail_count} rows.")
+    return result
+
+def send_incremental(changed: pd.DataFrame, api_url: str, uploader: Uploader,
+                     journal: CheckpointJournal = None, row_ids: dict = None):
     """
-    headers = {'Content-Type': 'application/json'}
-    success_count = 0
-    fail_count = 0
+    Uploads the counts returned by aggregate_incremental without reading the
+    table back. The latest day may still be partial: its rows are POSTed one
+    by one and their server ids kept in ``row_ids`` (updated in place), so
+    when a later dump re-counts that day (the watermark day) only the counts
+    that changed are PUT to ``<api_url>/<id>``. Every other day is new and
+    goes through the journal like a normal upload.
+    Returns the UploadResult.
+    """
+    row_ids = {} if row_ids is None else row_ids
+    if not len(changed):
+        return UploadResult()
 
-    for idx, row in df.iterrows():
-        payload = {
-            "entry_date": row["entry_date"],
-            "professional_role": row["professional_role"],
-            "vacancies_num": int(row["vacancies_num"])
-        }
+    tracked = changed['entry_date'].isin(set(row_ids) | {changed['entry_date'].max()})
+    result = upload_rows(api_url, vacancy_payloads(changed[~tracked]), uploader, journal=journal)
 
-        response = requests.post(api_url, json=payload, headers=headers)
-        if response.status_code == 201:
-            success_count += 1
+    new, updated, unchanged = 0, 0, 0
+    for idx, payload in vacancy_payloads(changed[tracked]):
+        day = row_ids.setdefault(payload['entry_date'], {})
+        sent = day.get(payload['professional_role'])
+        if sent is None:
+            new += 1
+            record = uploader.post_json(api_url, payload, idx)
+            if record is not None:
+                day[payload['professional_role']] = {
+                    'id': record['id'], 'vacancies_num': payload['vacancies_num']
+                }
+            result.record(idx, record is not None)
+        elif sent['vacancies_num'] != payload['vacancies_num']:
+            updated += 1
+            ok = uploader.put(f"{api_url.rstrip('/')}/{sent['id']}", payload, idx)
+            if ok:
+                sent['vacancies_num'] = payload['vacancies_num']
+            result.record(idx, ok)
         else:
-            fail_count += 1
-            print(f"❌ Failed at row {idx}: {response.status_code} — {response.text}")
+            unchanged += 1
+    print(f"🔄 Latest days: {new} new, {updated} changed, {unchanged} unchanged")
 
-    print(f"\n✅ Sent {success_count} rows successfully.")
-    if fail_count:
-        print(f"⚠️ Failed to send {fail_count} rows.")
+    print(f"\n✅ Sent {result.success_count} rows successfully.")
+    if result.fail_count:
+        print(f"⚠️ Failed to send {result.fail_count} rows.")
+    return result
+
+# 1. Path to your CSV file
+csv_file_path = str(Path(__file__).with_name("perm_krai.csv"))
+
+# 2. Your FastAPI endpoint
+api_endpoint = "http://localhost:8000/api/hh-ru-dataset/"
+
+
+def main(argv=None):
+    # --chunksize N streams the dump instead of loading it whole;
+    # --incremental only re-counts and uploads dates from the saved watermark
+    # on, the re-counted watermark day is updated by the ids kept from the
+    # previous run (see send_incremental)
+    parser = loader_parser("Aggregate the hh.ru vacancy dump and upload the counts")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='stream the CSV in chunks of N rows')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only re-count and upload dates from the saved watermark on')
+    args = parser.parse_args(argv)
 
-if __name__ == "__main__":
-    # 1. Path to your CSV file
-    csv_file_path = "perm_krai.csv"
-    
-    # 2. Your FastAPI endpoint
-    api_endpoint = "http://localhost:8000/api/hh-ru-dataset/"
-    
     # 3. Load, aggregate, and preview
-    df_summary = load_and_aggregate(csv_file_path)
+    with METRICS.stage("hr", "load"):
+        if args.incremental:
+            all_counts, df_summary = aggregate_incremental(csv_file_path, args.chunksize or 500_000)
+        else:
+            df_summary = load_and_aggregate(csv_file_path, args.chunksize)
     print("Grouped Data Preview:")
     print(df_summary, "\n")
     
     # 4. Send to API
-    send_data_to_api(df_summary, api_endpoint)
+    with uploader_from_args(args) as uploader, \
+            journal_from_args(args, csv_file_path, VACANCIES_KEY) as journal, \
+            METRICS.stage("hr", "upload"):
+        if args.incremental and not args.sync:
+            row_ids = load_row_ids(csv_file_path)
+            try:
+                result = send_incremental(df_summary, api_endpoint, uploader, journal, row_ids)
+            finally:
+                # Kept even after a failure: these rows are on the server already
+                save_row_ids(csv_file_path, row_ids)
+        else:
+            result = send_data_to_api(df_summary, api_endpoint, uploader, journal, sync=args.sync)
+    # The watermark only moves once every re-counted row is on the server
+    if args.incremental:
+        if result.fail_count:
+            print("⚠️ Watermark not advanced, the next run re-counts the same dates.")
+        else:
+            save_incremental_state(csv_file_path, all_counts)
+    write_metrics(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+kcp loader, importable as ``kcp.main`` or run as ``python -m kcp.main``.
+"""
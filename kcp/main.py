@@ -1,5 +1,32 @@
-import pandas as pd
-import requests
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.checkpoint import CheckpointJournal
+from common.cli import journal_from_args, loader_parser, uploader_from_args, write_metrics
+from common.dedup import drop_duplicate_rows
+from common.metrics import METRICS
+from common.records import as_int, iter_payloads, iter_record_payloads
+from common.schemas import CATEGORY, INTEGER, MIB, CsvSchema
+from common.sync import sync_rows
+from common.uploader import Uploader, upload_rows
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Payload fields identifying a row (checkpoint journal and --sync diff)
+KCP_KEY = ["study_field_code", "year"]
+
+# ~20 study fields repeat once per year
+KCP_SCHEMA = CsvSchema({
+    "year": INTEGER,
+    "study_field_code": CATEGORY,
+    "study_field_name": CATEGORY,
+    "kcp_num": INTEGER
+}, memory_budget=MIB // 4)
 
 def load_kcp_csv(csv_path: str) -> pd.DataFrame:
     """
@@ -9,19 +36,20 @@ def load_kcp_csv(csv_path: str) -> pd.DataFrame:
     - study_field_name
     - kcp_num
     """
-    df = pd.read_csv(csv_path, encoding='utf-8')
-    df.dropna(subset=['year', 'study_field_code', 'study_field_name', 'kcp_num'], inplace=True)
-    df = df.astype(str).apply(lambda col: col.str.strip())
-
-    # Ensure year and kcp_num are integers
-    df['year'] = df['year'].astype(int)
-    df['kcp_num'] = df['kcp_num'].astype(int)
+    # year and kcp_num come back as integers
+    return KCP_SCHEMA.read(csv_path)
 
-    return df
+def load_kcp_records(csv_path: str) -> list:
+    """
+    Same as load_kcp_csv without pandas: (idx, record) pairs.
+    """
+    return KCP_SCHEMA.read_records(csv_path)
 
-def send_kcp_to_api(df: pd.DataFrame, api_url: str):
+def send_kcp_to_api(df: pd.DataFrame, api_url: str, uploader: Uploader = None,
+                    journal: CheckpointJournal = None, sync: bool = False):
     """
     Sends each KCP row to the specified FastAPI endpoint using POST.
+    ``df`` is the load_kcp_csv frame or the load_kcp_records list.
     Expected payload:
     {
         "kcp_num": int,
@@ -30,43 +58,49 @@ def send_kcp_to_api(df: pd.DataFrame, api_url: str):
         "year": int
     }
     """
-    headers = {'Content-Type': 'application/json'}
-    success_count = 0
-    fail_count = 0
-
-    for idx, row in df.iterrows():
-        payload = {
-            "kcp_num": row["kcp_num"],
-            "study_field_code": row["study_field_code"],
-            "study_field_name": row["study_field_name"],
-            "year": row["year"]
-        }
-
-        try:
-            response = requests.post(api_url, json=payload, headers=headers)
-            if response.status_code == 201:
-                success_count += 1
-            else:
-                fail_count += 1
-                print(f"❌ Row {idx}: Status {response.status_code}, Response: {response.text}")
-        except requests.RequestException as e:
-            fail_count += 1
-            print(f"❌ Row {idx}: Exception occurred — {e}")
-
-    print(f"\n✅ Uploaded: {success_count} records")
-    if fail_count:
-        print(f"⚠️ Failed: {fail_count} records")
+    fields = ["kcp_num", "study_field_code", "study_field_name", "year"]
+    if isinstance(df, list):
+        rows = iter_record_payloads(df, fields)
+    else:
+        rows = iter_payloads(df, fields, casts={"kcp_num": as_int, "year": as_int})
+    if sync:
+        result = sync_rows(api_url, rows, KCP_KEY, uploader)
+    else:
+        result = upload_rows(api_url, rows, uploader, journal=journal)
+
+    print(f"\n✅ Uploaded: {result.success_count} records")
+    if result.fail_count:
+        print(f"⚠️ Failed: {result.fail_count} records")
 
 
 # Step 1: CSV file path
-csv_file_path = "kcp.csv"
+csv_file_path = str(Path(__file__).with_name("kcp.csv"))
 
 # Step 2: Your FastAPI endpoint
 api_endpoint = "http://localhost:8000/api/kcp-datasets/"
 
-# Step 3: Load the CSV
-kcp_df = load_kcp_csv(csv_file_path)
-print(f"Loaded {len(kcp_df)} KCP records.\n")
 
-# Step 4: Send to API
-send_kcp_to_api(kcp_df, api_endpoint)
+def main(argv=None):
+    # Command-line flags (see common.cli.loader_parser)
+    parser = loader_parser("Upload the KCP dataset")
+    parser.add_argument('--no-pandas', action='store_true',
+                        help='read the CSV with the csv module instead of pandas (faster start for small files)')
+    args = parser.parse_args(argv)
+
+    # Step 3: Load the CSV
+    with METRICS.stage("kcp", "load"):
+        kcp_df = load_kcp_records(csv_file_path) if args.no_pandas else load_kcp_csv(csv_file_path)
+    print(f"Loaded {len(kcp_df)} KCP records.\n")
+    with METRICS.stage("kcp", "dedupe"):
+        kcp_df = drop_duplicate_rows(kcp_df, KCP_KEY, name="KCP")
+
+    # Step 4: Send to API
+    with uploader_from_args(args) as uploader, \
+            journal_from_args(args, csv_file_path, KCP_KEY) as journal, \
+            METRICS.stage("kcp", "upload"):
+        send_kcp_to_api(kcp_df, api_endpoint, uploader, journal, sync=args.sync)
+    write_metrics(args)
+
+
+if __name__ == "__main__":
+    main()
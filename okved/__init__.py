@@ -0,0 +1,3 @@
+"""
+okved loader, importable as ``okved.main`` or run as ``python -m okved.main``.
+"""
@@ -1,5 +1,26 @@
-import pandas as pd
-import requests
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.checkpoint import CheckpointJournal
+from common.cli import journal_from_args, loader_parser, uploader_from_args, write_metrics
+from common.dedup import drop_duplicate_rows
+from common.metrics import METRICS
+from common.records import iter_payloads, iter_record_payloads
+from common.schemas import STRING, CsvSchema
+from common.sync import sync_rows
+from common.uploader import Uploader, upload_rows
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Payload fields identifying a row (checkpoint journal and --sync diff)
+OKVED_KEY = ["okved_code"]
+
+OKVED_SCHEMA = CsvSchema({"okved_code": STRING, "okved_name": STRING})
 
 def load_okved_csv(csv_path: str) -> pd.DataFrame:
     """
@@ -8,56 +29,64 @@ def load_okved_csv(csv_path: str) -> pd.DataFrame:
     - okved_name
     Очищает данные и возвращает DataFrame.
     """
-    df = pd.read_csv(csv_path, encoding='utf-8')
-    # Удаляем строки с пустыми обязательными полями
-    df.dropna(subset=['okved_code', 'okved_name'], inplace=True)
-    # Убираем пробелы вокруг текста
-    df = df.astype(str).apply(lambda col: col.str.strip())
-    return df
-
-def send_okved_to_api(df: pd.DataFrame, api_url: str):
+    # Пропускает строки с пустыми обязательными полями и убирает пробелы вокруг текста
+    return OKVED_SCHEMA.read(csv_path)
+
+def load_okved_records(csv_path: str) -> list:
+    """
+    То же, что load_okved_csv, но без pandas: список пар (idx, record).
+    """
+    return OKVED_SCHEMA.read_records(csv_path)
+
+def send_okved_to_api(df: pd.DataFrame, api_url: str, uploader: Uploader = None,
+                      journal: CheckpointJournal = None, sync: bool = False):
     """
     Отправляет каждую строку в FastAPI эндпоинт POST /okved-datasets/
+    ``df`` — DataFrame из load_okved_csv или список из load_okved_records.
     Формат JSON:
     {
       "okved_code": str,
       "okved_name": str
     }
     """
-    headers = {'Content-Type': 'application/json'}
-    success_count = 0
-    fail_count = 0
-
-    for idx, row in df.iterrows():
-        payload = {
-            "okved_code": row["okved_code"],
-            "okved_name": row["okved_name"]
-        }
-        try:
-            response = requests.post(api_url, json=payload, headers=headers)
-            if response.status_code == 201:
-                success_count += 1
-            else:
-                fail_count += 1
-                print(f"❌ Row {idx}: Status {response.status_code}, Response: {response.text}")
-        except requests.RequestException as e:
-            fail_count += 1
-            print(f"❌ Row {idx}: Exception occurred — {e}")
-
-    print(f"\n✅ Uploaded: {success_count} records")
-    if fail_count:
-        print(f"⚠️ Failed: {fail_count} records")
+    fields = ["okved_code", "okved_name"]
+    rows = iter_record_payloads(df, fields) if isinstance(df, list) else iter_payloads(df, fields)
+    if sync:
+        result = sync_rows(api_url, rows, OKVED_KEY, uploader)
+    else:
+        result = upload_rows(api_url, rows, uploader, journal=journal)
 
-if __name__ == "__main__":
-    # Укажи путь к CSV с данными OKVED
-    csv_file_path = "okved_sections.csv"
+    print(f"\n✅ Uploaded: {result.success_count} records")
+    if result.fail_count:
+        print(f"⚠️ Failed: {result.fail_count} records")
+
+# Укажи путь к CSV с данными OKVED
+csv_file_path = str(Path(__file__).with_name("okved_sections.csv"))
+
+# Укажи URL твоего FastAPI эндпоинта (поменяй на свой хост и порт)
+api_endpoint = "http://localhost:8000/api/okved-datasets/"
 
-    # Укажи URL твоего FastAPI эндпоинта (поменяй на свой хост и порт)
-    api_endpoint = "http://localhost:8000/api/okved-datasets/"
+
+def main(argv=None):
+    parser = loader_parser("Upload the OKVED sections dataset")
+    parser.add_argument('--no-pandas', action='store_true',
+                        help='read the CSV with the csv module instead of pandas (faster start for small files)')
+    args = parser.parse_args(argv)
 
     # Загружаем CSV
-    okved_df = load_okved_csv(csv_file_path)
+    with METRICS.stage("okved", "load"):
+        okved_df = load_okved_records(csv_file_path) if args.no_pandas else load_okved_csv(csv_file_path)
     print(f"Loaded {len(okved_df)} OKVED records.\n")
+    with METRICS.stage("okved", "dedupe"):
+        okved_df = drop_duplicate_rows(okved_df, OKVED_KEY, name="OKVED")
 
     # Отправляем данные на сервер
-    send_okved_to_api(okved_df, api_endpoint)
+    with uploader_from_args(args) as uploader, \
+            journal_from_args(args, csv_file_path, OKVED_KEY) as journal, \
+            METRICS.stage("okved", "upload"):
+        send_okved_to_api(okved_df, api_endpoint, uploader, journal, sync=args.sync)
+    write_metrics(args)
+
+
+if __name__ == "__main__":
+    main()
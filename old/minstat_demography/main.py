@@ -1,53 +1,50 @@
-import pandas as pd
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.rosstat import SheetLayout, parse_workbook
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Лист1: под шапкой в строке 23 — три группы относительно трудоспособного возраста
+DEMOGRAPHY_LAYOUTS = (
+    SheetLayout(sheet='лист1', header=23, id_column="age_group", value_column="people_num",
+                first_year=2010, last_year=2024, n_rows=3,
+                normalize=((r'(?i)^трудоспособном.*', "трудоспособного"),)),
+)
 
 
 def parse_demograph(file_path: str) -> pd.DataFrame:
     """
-    Reads the Excel file, extracts and reshapes the data from sheets '1' and '2',
-    and returns a DataFrame with columns [year, worker_num, okved_group].
+    Reads the Excel file, extracts and reshapes the data from sheet 'Лист1',
+    and returns a DataFrame with columns [age_group, year, people_num].
     """
-    xls = pd.ExcelFile(file_path)
-    data_frames = []
-
-
-    for sheet in xls.sheet_names:
-
-        # Общая часть: чтение и переименование колонок
-        if sheet.lower() == "лист1":
-            df = pd.read_excel(xls, sheet_name=sheet, header=23)
-            df.rename(columns={df.columns[0]: "age_group"}, inplace=True)
-            years = ["2010", "2011", "2012", "2013", "2014", "2015", "2016", "2017", "2018", "2019", "2020", "2021", "2022", "2023", "2024"]
-            for idx, year in enumerate(years, start=1):
-                df.rename(columns={df.columns[idx]: year}, inplace=True)
-
-            # Оставляем только первые 19 строк (группы)
-            df_cleaned = df.iloc[:3, :]
-
-            desired_name = "трудоспособного"
-
-            df_cleaned['age_group'] = df_cleaned['age_group'] \
-                .replace(
-                regex=r'(?i)^трудоспособном.*',
-                value=desired_name
-            )
-
-            # Переводим в длинный формат
-            df_long = df_cleaned.melt(
-                id_vars="age_group",
-                value_vars=years,
-                var_name="year",
-                value_name="people_num"
-            )
-
-            df_long["year"] = df_long["year"].astype(int)
-            df_long["people_num"] = df_long["people_num"].astype(float)
-            data_frames.append(df_long)
-
-    # Объединяем все годы и сохраняем
-    result_df = pd.concat(data_frames, ignore_index=True)
-    result_df.to_csv('demography_minstat_out.csv', index=False)
+    result_df = parse_workbook(file_path, DEMOGRAPHY_LAYOUTS)
+    result_df.to_csv(Path(file_path).with_name('demography_minstat_out.csv'), index=False)
     return result_df
 
 
+xlsx_file_path = str(Path(__file__).with_name(
+    "Распределение_населения_Пермского_края_по_возрастным_группам_в_2010.xlsx"
+))
+
+
+def main(argv=None):
+    # Только разбор сборника в demography_minstat_out.csv, без загрузки на API
+    parser = argparse.ArgumentParser(
+        description="Parse the Rosstat age-group workbook into demography_minstat_out.csv")
+    parser.add_argument('source', nargs='?', default=xlsx_file_path, help='workbook to parse')
+    args = parser.parse_args(argv)
+
+    parse_demograph(args.source)
+
+
 # Запуск
-parse_demograph("Распределение_населения_Пермского_края_по_возрастным_группам_в_2010.xlsx")
+if __name__ == "__main__":
+    main()
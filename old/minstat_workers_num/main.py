@@ -1,5 +1,20 @@
-import pandas as pd
-import requests
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.cli import loader_parser, uploader_from_args, write_metrics
+from common.dedup import drop_duplicate_rows
+from common.foreign_keys import ForeignKeyResolver
+from common.metrics import METRICS
+from common.records import as_float, as_int, iter_payloads
+from common.rosstat import SheetLayout, parse_workbook
+from common.uploader import Uploader
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # OKVED_API = "http://localhost:8000/okved_sections/"
 # EMPLOYMENT_API = "http://127.0.0.1:8000/employment_minstat/"
@@ -7,49 +22,64 @@ import requests
 OKVED_API = "https://vkr-api.vyachik-dev.ru/okved_sections/"
 EMPLOYMENT_API = "https://vkr-api.vyachik-dev.ru/employment_minstat/"
 
-def push_okveds_and_employment(df: pd.DataFrame):
+# ID разделов ОКВЭД кэшируются рядом со скриптом на сутки
+OKVED_IDS_CACHE = Path(__file__).with_name("okved_sections.ids.json")
+
+
+def okved_section_payload(okved_group: str) -> dict:
+    return {
+        "okved_section_name": okved_group,
+        "okved_section_code": "",  # optional
+        "img_url": ""  # optional
+    }
+
+
+def okved_section_resolver() -> ForeignKeyResolver:
+    return ForeignKeyResolver(OKVED_API, "okved_section_name", okved_section_payload,
+                              cache_path=OKVED_IDS_CACHE, expected_status=200)
+
+
+def push_okveds_and_employment(df: pd.DataFrame, uploader: Uploader = None,
+                               resolver: ForeignKeyResolver = None):
     """
-    Sends OKVEDs to FastAPI and inserts employment data per year.
+    Creates the OKVED sections the server does not have yet and inserts
+    employment data per year, with every section ID resolved up front.
     """
-    # Create a mapping from okved_group to section ID
-    okved_to_id = {}
-
-    for okved_group in df["okved_group"].unique():
-        payload = {
-            "okved_section_name": str(okved_group),
-            "okved_section_code": "",  # optional
-            "img_url": ""  # optional
-        }
-        response = requests.post(OKVED_API, json=payload)
-        if response.status_code == 200:
-            okved_id = response.json()["id"]
-            okved_to_id[okved_group] = okved_id
-        else:
-            print(f"Failed to post OKVED: {okved_group}, {response.text}")
-
-    resp = requests.get(OKVED_API)
-    resp.raise_for_status()
-    existing = resp.json()  # [{ "id": 1, "code":"", "name":"A" }, …]
-    okved_to_id = {e["okved_section_name"]: e["id"] for e in existing}
-
-    # Send employment data
-    for _, row in df.iterrows():
-        okved_id = okved_to_id.get(row["okved_group"])
-        if not okved_id:
-            print(f"Missing ID for {row['okved_group']}, skipping")
-            continue
-
-        payload = {
-            "year": int(row["year"]),
-            "number_of_employees": float(row["worker_num"]),
-            "okved_section_id": okved_id
-        }
-        resp = requests.post(EMPLOYMENT_API, json=payload)
-        if resp.status_code != 200:
-            print(f"Failed to insert employment for {row['okved_group']} in {row['year']}:",
-                  resp.text)
-
-import pandas as pd
+    own_uploader = uploader is None
+    if own_uploader:
+        uploader = Uploader()
+    resolver = resolver or okved_section_resolver()
+
+    try:
+        # Map okved_group to section ID, creating missing sections in one pass
+        employment = df.assign(okved_section_id=resolver.resolve(df["okved_group"], uploader))
+        for okved_group in employment.loc[employment["okved_section_id"].isna(), "okved_group"]:
+            print(f"Missing ID for {okved_group}, skipping")
+        employment = employment.dropna(subset=["okved_section_id"])
+        employment.index = employment["okved_group"] + " (" + employment["year"].astype(str) + ")"
+
+        employment_rows = iter_payloads(
+            employment,
+            {
+                "year": "year",
+                "number_of_employees": "worker_num",
+                "okved_section_id": "okved_section_id"
+            },
+            casts={"year": as_int, "number_of_employees": as_float, "okved_section_id": as_int}
+        )
+        uploader.post_rows(EMPLOYMENT_API, employment_rows, expected_status=200)
+    finally:
+        if own_uploader:
+            uploader.close()
+
+# Та же разметка, что и в stat_otchetnost, но без приведения регистра
+OKVED_LAYOUTS = (
+    SheetLayout(sheet='1', header=6, id_column="okved_group", value_column="worker_num",
+                first_year=2010, last_year=2016, n_rows=19),
+    SheetLayout(sheet='2', header=6, id_column="okved_group", value_column="worker_num",
+                first_year=2017, last_year=2023, n_rows=19,
+                normalize=((r'(?i)^сельское.*', "сельское, лесное хозяйство, охота, рыболовство и рыбоводство"),)),
+)
 
 
 def parse_okved(file_path: str) -> pd.DataFrame:
@@ -57,53 +87,35 @@ def parse_okved(file_path: str) -> pd.DataFrame:
     Reads the Excel file, extracts and reshapes the data from sheets '1' and '2',
     and returns a DataFrame with columns [year, worker_num, okved_group].
     """
-    xls = pd.ExcelFile(file_path)
-    data_frames = []
-
-
-    for sheet in xls.sheet_names:
-        if sheet.lower() == "содержание":
-            continue
-
-        # чтение и переименование колонок
-        if sheet == '1' or sheet == '2':
-            df = pd.read_excel(xls, sheet_name=sheet, header=6)
-            df.rename(columns={df.columns[0]: "okved_group"}, inplace=True)
-            years = ["2010", "2011", "2012", "2013", "2014", "2015", "2016"] if sheet == '1' \
-                else ["2017", "2018", "2019", "2020", "2021", "2022", "2023"]
-            for idx, year in enumerate(years, start=1):
-                df.rename(columns={df.columns[idx]: year}, inplace=True)
-
-            # Оставляем только первые 19 строк (далше идут проценты)
-            df_cleaned = df.iloc[:19, :]
-
-            desired_name = "сельское, лесное хозяйство, охота, рыболовство и рыбоводство"
-            # если это второй лист — нормализуем название группы
-            if sheet == '2':
-                df_cleaned['okved_group'] = df_cleaned['okved_group'] \
-                    .replace(
-                    regex=r'(?i)^сельское.*',
-                    value=desired_name
-                )
-
-            # Переводим в длинный формат
-            df_long = df_cleaned.melt(
-                id_vars="okved_group",
-                value_vars=years,
-                var_name="year",
-                value_name="worker_num"
-            )
-            df_long["year"] = df_long["year"].astype(int)
-            df_long["worker_num"] = df_long["worker_num"].astype(float)
-            data_frames.append(df_long)
-
-    # Объединяем все года и сохраняем
-    result_df = pd.concat(data_frames, ignore_index=True)
-    result_df.to_csv('jobs_minstat_out.csv', index=False)
+    result_df = parse_workbook(file_path, OKVED_LAYOUTS)
+    result_df.to_csv(Path(file_path).with_name('jobs_minstat_out.csv'), index=False)
     return result_df
 
 
-# Запуск
-df = parse_okved("Среднегодовая_численность_занятых_по_видам_деятельности_в_Пермском.xlsx")
+def main(argv=None):
+    # Флаги командной строки (см. common.cli.loader_parser)
+    parser = loader_parser("Upload OKVED sections and minstat employment")
+    parser.add_argument("--refresh-ids", action="store_true",
+                        help="ignore the cached OKVED section IDs and fetch them again")
+    args = parser.parse_args(argv)
+
+    with METRICS.stage("minstat_workers_num", "load"):
+        df = parse_okved(str(Path(__file__).with_name(
+            "Среднегодовая_численность_занятых_по_видам_деятельности_в_Пермском.xlsx"
+        )))
+
+    with METRICS.stage("minstat_workers_num", "dedupe"):
+        df = drop_duplicate_rows(df, ["okved_group", "year"], name="Employment")
 
-push_okveds_and_employment(df)
\ No newline at end of file
+    resolver = okved_section_resolver()
+    if args.refresh_ids:
+        resolver.invalidate()
+
+    with uploader_from_args(args) as uploader, METRICS.stage("minstat_workers_num", "upload"):
+        push_okveds_and_employment(df, uploader, resolver)
+    write_metrics(args)
+
+
+# Запуск
+if __name__ == "__main__":
+    main()
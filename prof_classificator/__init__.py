@@ -0,0 +1,3 @@
+"""
+prof_classificator loader, importable as ``prof_classificator.main`` or run as ``python -m prof_classificator.main``.
+"""
@@ -1,27 +1,87 @@
+from __future__ import annotations
 
-import pandas as pd
-import requests
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-def load_classificator_csv(csv_path: str) -> pd.DataFrame:
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.checkpoint import CheckpointJournal
+from common.cli import journal_from_args, loader_parser, uploader_from_args, write_metrics
+from common.dedup import drop_duplicate_rows
+from common.metrics import METRICS
+from common.pipeline import stream_csv_rows
+from common.records import as_optional, iter_payloads
+from common.schemas import CATEGORY, MIB, STRING, CsvSchema
+from common.sync import sync_rows
+from common.uploader import Uploader, upload_rows
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Payload fields identifying a row (checkpoint journal and --sync diff)
+PROF_KEY = ["prof_code"]
+
+# Raw OKPDTR export column -> payload field
+OKPDTR_COLUMNS = {
+    "Код": "prof_code",
+    "Наименование профессии": "prof_name"
+}
+OKPDTR_CODE_COLUMNS = {
+    "КЧ": "prof_check_number",
+    "Код категории": "prof_category_code",
+    "Код выпуска ЕТКС": "prof_etks_code",
+    "Код по ОКЗ": "prof_okz_code"
+}
+
+PROF_SCHEMA = CsvSchema(dict.fromkeys(OKPDTR_COLUMNS, STRING), memory_budget=MIB)
+# The code columns hold a few dozen to a few hundred distinct values each
+PROF_CODES_SCHEMA = CsvSchema(
+    {**dict.fromkeys(OKPDTR_COLUMNS, STRING), **dict.fromkeys(OKPDTR_CODE_COLUMNS, CATEGORY)},
+    required=tuple(OKPDTR_COLUMNS),
+    memory_budget=MIB
+)
+
+def load_classificator_csv(csv_path: str, with_codes: bool = False) -> pd.DataFrame:
     """
-    Load and validate classificator-prof-dataset CSV file.
+    Load and validate the raw OKPDTR classifier export (semicolon-separated).
 
-    Required columns:
+    Only the needed columns are parsed, renamed to:
     - prof_code
     - prof_name
+    - with_codes: also prof_check_number, prof_category_code, prof_etks_code, prof_okz_code
+
+    Rows without a profession name (the positions part of OKPDTR) are dropped,
+    as are repeated codes (the first occurrence wins, conflicts are reported).
     """
-    df = pd.read_csv(csv_path, encoding='utf-8')
+    schema = PROF_CODES_SCHEMA if with_codes else PROF_SCHEMA
+    df = schema.read(csv_path, sep=';').rename(columns={**OKPDTR_COLUMNS, **OKPDTR_CODE_COLUMNS})
+    return drop_duplicate_rows(df, PROF_KEY, name="OKPDTR")
 
-    required_columns = ['prof_code', 'prof_name']
-    for col in required_columns:
-        if col not in df.columns:
-            raise ValueError(f"Missing required column: {col}")
+def prof_payload_fields(with_codes: bool = False):
+    """
+    Payload fields and their casts, with or without the OKPDTR code fields.
+    """
+    fields = list(OKPDTR_COLUMNS.values())
+    casts = {}
+    if with_codes:
+        fields += OKPDTR_CODE_COLUMNS.values()
+        casts = dict.fromkeys(OKPDTR_CODE_COLUMNS.values(), as_optional)
+    return fields, casts
 
-    df.dropna(subset=required_columns, inplace=True)
-    df = df.astype(str).apply(lambda col: col.str.strip())
-    return df
+def stream_classificator_rows(csv_path: str, with_codes: bool = False):
+    """
+    (idx, payload) rows of load_classificator_csv, read and cleaned chunk by
+    chunk in background threads while they are being uploaded.
+    """
+    schema = PROF_CODES_SCHEMA if with_codes else PROF_SCHEMA
+    fields, casts = prof_payload_fields(with_codes)
+    return stream_csv_rows(schema, csv_path, fields, casts,
+                           rename={**OKPDTR_COLUMNS, **OKPDTR_CODE_COLUMNS},
+                           key_fields=PROF_KEY, name="OKPDTR", sep=';')
 
-def post_prof_dataset_to_api(df: pd.DataFrame, api_url: str):
+def post_prof_dataset_to_api(df: pd.DataFrame, api_url: str, uploader: Uploader = None,
+                             journal: CheckpointJournal = None, sync: bool = False,
+                             with_codes: bool = False):
     """
     Post each row of classificator data to FastAPI backend.
 
@@ -30,40 +90,62 @@ def post_prof_dataset_to_api(df: pd.DataFrame, api_url: str):
         "prof_code": "10003",
         "prof_name": "Авербандщик"
     }
+    with_codes adds the OKPDTR code fields, null where the classifier has none.
+    """
+    rows = iter_payloads(df, *prof_payload_fields(with_codes))
+    post_prof_rows(rows, api_url, uploader, journal, sync)
+
+def post_prof_rows(rows, api_url: str, uploader: Uploader = None,
+                   journal: CheckpointJournal = None, sync: bool = False):
     """
-    headers = {'Content-Type': 'application/json'}
-    success_count = 0
-    fail_count = 0
-
-    for idx, row in df.iterrows():
-        payload = {
-            "prof_code": row["prof_code"],
-            "prof_name": row["prof_name"]
-        }
-
-        try:
-            response = requests.post(api_url, json=payload, headers=headers)
-            if response.status_code == 201:
-                success_count += 1
-            else:
-                fail_count += 1
-                print(f"❌ Row {idx}: Status {response.status_code}, Response: {response.text}")
-        except requests.RequestException as e:
-            fail_count += 1
-            print(f"❌ Row {idx}: Exception — {e}")
-
-    print(f"\n✅ Uploaded: {success_count} records")
-    if fail_count:
-        print(f"⚠️ Failed: {fail_count} records")
+    Uploads ready (idx, payload) rows, e.g. from stream_classificator_rows.
+    """
+    if sync:
+        result = sync_rows(api_url, rows, PROF_KEY, uploader)
+    else:
+        result = upload_rows(api_url, rows, uploader, journal=journal)
+
+    print(f"\n✅ Uploaded: {result.success_count} records")
+    if result.fail_count:
+        print(f"⚠️ Failed: {result.fail_count} records")
 
 # === CONFIGURATION ===
 
-csv_file_path = "professions.csv"  # Update if needed
+csv_file_path = str(Path(__file__).with_name("classifierOkpdtr_7UTF-8.csv"))  # Update if needed
 api_endpoint = "http://localhost:8000/classificator-prof-datasets/"  # Adjust as needed
 
 # === EXECUTION ===
 
-df = load_classificator_csv(csv_file_path)
-print(f"📄 Loaded {len(df)} records from CSV.")
+def main(argv=None):
+    parser = loader_parser("Upload the OKPDTR professions classificator")
+    parser.add_argument("--with-codes", action="store_true",
+                        help="also send the check number, category, ETKS and OKZ codes")
+    parser.add_argument("--stream", action="store_true",
+                        help="read, clean and upload the CSV in overlapping chunks")
+    args = parser.parse_args(argv)
+
+    if args.stream:
+        # Reading the CSV is part of the upload stage here
+        print(f"📄 Streaming records from {csv_file_path}")
+        with uploader_from_args(args) as uploader, \
+                journal_from_args(args, csv_file_path, PROF_KEY) as journal, \
+                METRICS.stage("prof_classificator", "upload"):
+            rows = stream_classificator_rows(csv_file_path, with_codes=args.with_codes)
+            post_prof_rows(rows, api_endpoint, uploader, journal, sync=args.sync)
+        write_metrics(args)
+        return
+
+    with METRICS.stage("prof_classificator", "load"):
+        df = load_classificator_csv(csv_file_path, with_codes=args.with_codes)
+    print(f"📄 Loaded {len(df)} records from CSV.")
+
+    with uploader_from_args(args) as uploader, \
+            journal_from_args(args, csv_file_path, PROF_KEY) as journal, \
+            METRICS.stage("prof_classificator", "upload"):
+        post_prof_dataset_to_api(df, api_endpoint, uploader, journal, sync=args.sync,
+                                 with_codes=args.with_codes)
+    write_metrics(args)
+
 
-post_prof_dataset_to_api(df, api_endpoint)
+if __name__ == "__main__":
+    main()
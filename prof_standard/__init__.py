@@ -0,0 +1,3 @@
+"""
+prof_standard loader, importable as ``prof_standard.main`` or run as ``python -m prof_standard.main``.
+"""
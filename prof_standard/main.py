@@ -1,5 +1,38 @@
-import pandas as pd
-import requests
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.checkpoint import CheckpointJournal
+from common.cli import journal_from_args, loader_parser, uploader_from_args, write_metrics
+from common.dedup import dedupe_payloads, drop_duplicate_rows
+from common.metrics import METRICS
+from common.pipeline import stream_csv_rows
+from common.records import iter_payloads
+from common.schemas import CATEGORY, MIB, STRING, CsvSchema
+from common.sync import sync_rows
+from common.uploader import Uploader, upload_rows
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Payload fields identifying a row (checkpoint journal and --sync diff)
+PROF_STANDARD_KEY = ["prof_standard_code"]
+
+PROF_STANDARD_COLUMNS = [
+    "prof_standard_code",
+    "prof_standard_sphere",
+    "prof_standard_type",
+    "prof_standard_name"
+]
+
+# ~35 spheres repeat across the registry; the types are nearly all distinct texts
+PROF_STANDARD_SCHEMA = CsvSchema(
+    {**dict.fromkeys(PROF_STANDARD_COLUMNS, STRING), "prof_standard_sphere": CATEGORY},
+    memory_budget=MIB
+)
 
 def load_profstandards_csv(csv_path: str) -> pd.DataFrame:
     """
@@ -9,25 +42,53 @@ def load_profstandards_csv(csv_path: str) -> pd.DataFrame:
     - prof_standard_type
     - prof_standard_name
     """
-    df = pd.read_csv(csv_path, encoding='utf-8')
-    
-    required_columns = [
-        'prof_standard_code',
-        'prof_standard_sphere',
-        'prof_standard_type',
-        'prof_standard_name'
-    ]
-    
-    # Validate column existence
-    for col in required_columns:
-        if col not in df.columns:
-            raise ValueError(f"Missing required column: {col}")
-    
-    df.dropna(subset=required_columns, inplace=True)
-    df = df.astype(str).apply(lambda col: col.str.strip())  # Clean whitespace
-    return df
-
-def send_profstandards_to_api(df: pd.DataFrame, api_url: str):
+    return PROF_STANDARD_SCHEMA.read(csv_path)
+
+def stream_profstandards_csv(csv_path: str):
+    """
+    (idx, payload) rows of load_profstandards_csv, read and cleaned chunk by
+    chunk in background threads while they are being uploaded.
+    """
+    return stream_csv_rows(PROF_STANDARD_SCHEMA, csv_path, PROF_STANDARD_COLUMNS,
+                           key_fields=PROF_STANDARD_KEY, name="Professional standards")
+
+def iter_profstandards_xlsx(xlsx_path: str):
+    """
+    Streams the registry workbook (Реестр_профессиональных_стандартов_*.xlsx)
+    in openpyxl read-only mode and yields (excel_row, payload) pairs with the
+    same columns and cleaning as load_profstandards_csv. The first sheet's
+    header row must hold the column names. Memory use does not grow with
+    the registry size.
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        header = [str(cell).strip() if cell is not None else None for cell in header]
+
+        # Validate column existence
+        for col in PROF_STANDARD_COLUMNS:
+            if col not in header:
+                raise ValueError(f"Missing required column: {col}")
+        positions = [header.index(col) for col in PROF_STANDARD_COLUMNS]
+
+        # max_col keeps openpyxl from materializing the sheet's empty columns
+        rows = ws.iter_rows(min_row=2, max_col=max(positions) + 1, values_only=True)
+        for excel_row, row in enumerate(rows, start=2):
+            values = [row[pos] if pos < len(row) else None for pos in positions]
+            # Same as dropna: skip rows with an empty required field
+            if any(value is None or value == '' for value in values):
+                continue
+            yield excel_row, {
+                col: str(value).strip() for col, value in zip(PROF_STANDARD_COLUMNS, values)
+            }
+    finally:
+        wb.close()
+
+def send_profstandards_to_api(df: pd.DataFrame, api_url: str, uploader: Uploader = None,
+                              journal: CheckpointJournal = None, sync: bool = False):
     """
     Sends each professional standard row to the specified FastAPI endpoint using POST.
     Expected payload:
@@ -38,44 +99,67 @@ def send_profstandards_to_api(df: pd.DataFrame, api_url: str):
         "prof_standard_name": str
     }
     """
-    headers = {'Content-Type': 'application/json'}
-    success_count = 0
-    fail_count = 0
-
-    for idx, row in df.iterrows():
-        payload = {
-            "prof_standard_code": row["prof_standard_code"],
-            "prof_standard_sphere": row["prof_standard_sphere"],
-            "prof_standard_type": row["prof_standard_type"],
-            "prof_standard_name": row["prof_standard_name"]
-        }
-
-        try:
-            response = requests.post(api_url, json=payload, headers=headers)
-            if response.status_code == 201:
-                success_count += 1
-            else:
-                fail_count += 1
-                print(f"❌ Row {idx}: Status {response.status_code}, Response: {response.text}")
-        except requests.RequestException as e:
-            fail_count += 1
-            print(f"❌ Row {idx}: Exception occurred — {e}")
+    rows = iter_payloads(df, PROF_STANDARD_COLUMNS)
+    send_profstandard_rows(rows, api_url, uploader, journal, sync)
+
+def send_profstandard_rows(rows, api_url: str, uploader: Uploader = None,
+                           journal: CheckpointJournal = None, sync: bool = False):
+    """
+    Uploads ready (idx, payload) rows, e.g. streamed by iter_profstandards_xlsx
+    or stream_profstandards_csv.
+    """
+    if sync:
+        result = sync_rows(api_url, rows, PROF_STANDARD_KEY, uploader)
+    else:
+        result = upload_rows(api_url, rows, uploader, journal=journal)
 
-    print(f"\n✅ Uploaded: {success_count} records")
-    if fail_count:
-        print(f"⚠️ Failed: {fail_count} records")
+    print(f"\n✅ Uploaded: {result.success_count} records")
+    if result.fail_count:
+        print(f"⚠️ Failed: {result.fail_count} records")
 
 # === CONFIGURATION ===
 
-# Step 1: CSV file path
-csv_file_path = "prof_standard.csv"  # Replace with your actual file path
+# Step 1: CSV file path (or the registry .xlsx, passed on the command line)
+csv_file_path = str(Path(__file__).with_name("prof_standard.csv"))  # Replace with your actual file path
 
 # Step 2: FastAPI endpoint
 api_endpoint = "http://localhost:8000/api/prof-standard-datasets/"  # Replace with your actual endpoint
 
-# Step 3: Load and clean data
-prof_df = load_profstandards_csv(csv_file_path)
-print(f"📄 Loaded {len(prof_df)} professional standards records.\n")
 
-# Step 4: Send to API
-send_profstandards_to_api(prof_df, api_endpoint)
+def main(argv=None):
+    parser = loader_parser("Upload the professional standards registry")
+    parser.add_argument('source', nargs='?', default=csv_file_path,
+                        help='prof_standard.csv or the registry .xlsx')
+    parser.add_argument('--stream', action='store_true',
+                        help='read, clean and upload the CSV in overlapping chunks (an .xlsx always streams)')
+    args = parser.parse_args(argv)
+
+    with uploader_from_args(args) as uploader, \
+            journal_from_args(args, args.source, PROF_STANDARD_KEY) as journal:
+        if args.source.endswith('.xlsx') or args.stream:
+            # Step 3-4: Stream the registry straight to the API
+            # (reading the file is part of the upload stage here)
+            print(f"📄 Streaming professional standards from {args.source}\n")
+            if args.source.endswith('.xlsx'):
+                rows = dedupe_payloads(iter_profstandards_xlsx(args.source), PROF_STANDARD_KEY,
+                                       name="Professional standards")
+            else:
+                rows = stream_profstandards_csv(args.source)
+            with METRICS.stage("prof_standard", "upload"):
+                send_profstandard_rows(rows, api_endpoint, uploader, journal, sync=args.sync)
+        else:
+            # Step 3: Load and clean data
+            with METRICS.stage("prof_standard", "load"):
+                prof_df = load_profstandards_csv(args.source)
+            print(f"📄 Loaded {len(prof_df)} professional standards records.\n")
+            with METRICS.stage("prof_standard", "dedupe"):
+                prof_df = drop_duplicate_rows(prof_df, PROF_STANDARD_KEY, name="Professional standards")
+
+            # Step 4: Send to API
+            with METRICS.stage("prof_standard", "upload"):
+                send_profstandards_to_api(prof_df, api_endpoint, uploader, journal, sync=args.sync)
+    write_metrics(args)
+
+
+if __name__ == "__main__":
+    main()
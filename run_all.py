@@ -0,0 +1,175 @@
+"""
+Runs the dataset loaders as one pipeline.
+
+Every loader script is registered as a job together with the jobs it
+depends on. Independent jobs run in parallel threads, a job starts as soon
+as its dependencies have finished, and dependents of a failed job are
+skipped. A per-job timing report is printed at the end.
+
+    python run_all.py                          # every job
+    python run_all.py stat_otchetnost          # the job and its dependencies
+    python run_all.py --concurrency 16 --sync  # upload flags go to every job
+    python run_all.py --dry-run hr             # print the plan, load nothing
+"""
+import importlib
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+from common.cli import loader_parser, upload_argv, write_metrics
+
+
+@dataclass(frozen=True)
+class Job:
+    """
+    - name: job name used on the command line
+    - script: loader script (relative to the repo root) exposing main(argv)
+    - depends_on: jobs that must succeed before this one starts
+    """
+    name: str
+    script: str
+    depends_on: tuple = ()
+
+
+@dataclass
+class JobResult:
+    status: str             # ok / failed / skipped
+    seconds: float = 0.0
+    error: str = ''
+
+
+# The registered loaders are independent: each posts to its own endpoint and
+# no payload refers to another dataset's IDs, so they all run in parallel.
+# (stat_otchetnost sends OKVED group names, not /api/okved-datasets/ rows; the
+# one real ordering, OKVED sections before employment, is handled inside
+# old/minstat_workers_num by push_okveds_and_employment.) Add depends_on
+# when a loader starts resolving another dataset's IDs.
+JOBS = (
+    Job('okved', 'okved/main.py'),
+    Job('fgos', 'fgos/main.py'),
+    Job('kcp', 'kcp/main.py'),
+    Job('prof_classificator', 'prof_classificator/main.py'),
+    Job('prof_standard', 'prof_standard/main.py'),
+    Job('stat_otchetnost', 'stat_otchetnost/main.py'),
+    Job('hr', 'hr/main.py'),
+)
+
+
+def load_job_module(job: Job):
+    # Loader directories are packages: "kcp/main.py" is imported as kcp.main,
+    # once, even when several jobs start at the same time
+    return importlib.import_module(Path(job.script).with_suffix('').as_posix().replace('/', '.'))
+
+
+def select_jobs(names, jobs=JOBS) -> list:
+    """
+    Returns the named jobs plus everything they depend on, in registry order.
+    """
+    by_name = {job.name: job for job in jobs}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown job(s): {', '.join(unknown)}")
+
+    wanted = set()
+    stack = list(names) or list(by_name)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(by_name[name].depends_on)
+    return [job for job in jobs if job.name in wanted]
+
+
+def run_job(job: Job, argv: list) -> JobResult:
+    started = time.perf_counter()
+    try:
+        load_job_module(job).main(argv)
+    except (Exception, SystemExit) as e:
+        traceback.print_exc()
+        return JobResult('failed', time.perf_counter() - started, f"{type(e).__name__}: {e}")
+    return JobResult('ok', time.perf_counter() - started)
+
+
+def run_pipeline(jobs, argv: list = (), workers: int = None) -> dict:
+    """
+    Runs ``jobs`` respecting their dependencies and returns {name: JobResult}.
+    """
+    pending = {job.name: job for job in jobs}
+    results = {}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=workers or len(pending) or 1) as pool:
+        while pending or running:
+            for job in list(pending.values()):
+                deps = job.depends_on
+                if any(dep not in results for dep in deps):
+                    continue
+                del pending[job.name]
+                failed = [dep for dep in deps if results[dep].status != 'ok']
+                if failed:
+                    results[job.name] = JobResult('skipped', error=f"dependency failed: {', '.join(failed)}")
+                    continue
+                print(f"▶️ {job.name}")
+                running[pool.submit(run_job, job, list(argv))] = job
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Dependency cycle between: {', '.join(pending)}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                results[job.name] = future.result()
+                print(f"⏹️ {job.name}: {results[job.name].status} in {results[job.name].seconds:.2f} s")
+    return results
+
+
+def print_plan(jobs, argv: list):
+    print(f"🧭 Dry run: {len(jobs)} jobs" + (f", flags: {' '.join(argv)}" if argv else ''))
+    for job in jobs:
+        line = f"  {job.name:<20} {job.script}"
+        if job.depends_on:
+            line += f"  (after {', '.join(job.depends_on)})"
+        print(line)
+
+
+def print_report(jobs, results: dict, wall_seconds: float):
+    print("\n📊 Pipeline report")
+    print(f"{'job':<20} {'status':<8} {'seconds':>8}")
+    for job in jobs:
+        result = results[job.name]
+        line = f"{job.name:<20} {result.status:<8} {result.seconds:>8.2f}"
+        if result.error:
+            line += f"  {result.error}"
+        print(line)
+    total = sum(result.seconds for result in results.values())
+    print(f"Wall time {wall_seconds:.2f} s, sum of job times {total:.2f} s")
+
+
+def main(argv=None):
+    parser = loader_parser("Run the dataset loaders as one pipeline")
+    parser.add_argument('jobs', nargs='*', help=f"jobs to run (default: all): {', '.join(job.name for job in JOBS)}")
+    parser.add_argument('--workers', type=int, default=None, help='jobs run at the same time')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='print the jobs that would run, without loading or uploading')
+    args = parser.parse_args(argv)
+
+    jobs = select_jobs(args.jobs)
+    if args.dry_run:
+        print_plan(jobs, upload_argv(args))
+        return 0
+    started = time.perf_counter()
+    results = run_pipeline(jobs, upload_argv(args), args.workers)
+    print_report(jobs, results, time.perf_counter() - started)
+    write_metrics(args)
+    return 0 if all(result.status == 'ok' for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,17 @@
-import pandas as pd
-import requests
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[0]))
+from common.cli import loader_parser, uploader_from_args, write_metrics
+from common.metrics import METRICS
+from common.records import iter_payloads
+from common.uploader import Uploader, upload_rows
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 date_ideas = [
     {"title": "Вечер рисования", "description": "Организуйте арт-вечер с красками и холстами, даже если вы не умеете рисовать."},
@@ -53,32 +65,32 @@ date_ideas = [
 
 
 # Функция отправки на API
-def send_ideas_to_api(df: pd.DataFrame, api_url: str):
-    headers = {'Content-Type': 'application/json'}
-    success_count, fail_count = 0, 0
+def send_ideas_to_api(df: pd.DataFrame, api_url: str, uploader: Uploader = None):
+    rows = iter_payloads(df, ["title", "description"])
+    result = upload_rows(api_url, rows, uploader)
+
+    print(f"\n✅ Sent {result.success_count} ideas successfully.")
+    if result.fail_count:
+        print(f"⚠️ Failed to send {result.fail_count} ideas.")
+
+# Параметры
+api_url = "https://api-date-ideas.vyachik-dev.ru/date-ideas"
 
-    for idx, row in df.iterrows():
-        payload = {
-            "title": row["title"],
-            "description": row["description"]
-        }
 
-        response = requests.post(api_url, json=payload, headers=headers)
-        if response.status_code == 201:
-            success_count += 1
-        else:
-            fail_count += 1
-            print(f"❌ Failed at row {idx}: {response.status_code} — {response.text}")
+def main(argv=None):
+    # Флаги командной строки (см. common.cli.loader_parser)
+    args = loader_parser("Upload date ideas").parse_args(argv)
 
-    print(f"\n✅ Sent {success_count} ideas successfully.")
-    if fail_count:
-        print(f"⚠️ Failed to send {fail_count} ideas.")
+    import pandas as pd
 
-# Преобразуем в DataFrame
-df_ideas = pd.DataFrame(date_ideas)
+    # Преобразуем в DataFrame
+    df_ideas = pd.DataFrame(date_ideas)
+
+    # Вызывать эту функцию можно после проверки и готовности API
+    with uploader_from_args(args) as uploader, METRICS.stage("date_ideas", "upload"):
+        send_ideas_to_api(df_ideas, api_url, uploader)
+    write_metrics(args)
 
-# Параметры
-api_url = "https://api-date-ideas.vyachik-dev.ru/date-ideas"
 
-# Вызывать эту функцию можно после проверки и готовности API
-send_ideas_to_api(df_ideas, api_url)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
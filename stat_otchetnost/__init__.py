@@ -0,0 +1,3 @@
+"""
+stat_otchetnost loader, importable as ``stat_otchetnost.main`` or run as ``python -m stat_otchetnost.main``.
+"""
@@ -1,32 +1,74 @@
-import pandas as pd
-import requests
+from __future__ import annotations
 
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-def send_data_to_api(df: pd.DataFrame, api_url: str):
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.checkpoint import CheckpointJournal
+from common.cli import journal_from_args, loader_parser, uploader_from_args, write_metrics
+from common.dedup import drop_duplicate_rows
+from common.metrics import METRICS
+from common.records import as_int, iter_payloads, rounded
+from common.rosstat import SheetLayout, parse_workbook, parse_workbooks
+from common.sync import sync_rows
+from common.uploader import Uploader, upload_rows
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Payload fields identifying a row (checkpoint journal and --sync diff)
+WORKERS_KEY = ["okved_group", "year"]
+WORKERS_FIELDS = ["okved_group", "worker_num", "year"]
+
+# Added by parse_okved_many: the workbook, i.e. the region, a row comes from.
+# /api/minstat-workers/ has no region column, so it is only a local key
+SOURCE_FIELD = "source_file"
+
+def workers_key(df: pd.DataFrame) -> list:
     """
-    Sends each row of the DataFrame to the specified FastAPI endpoint using POST.
+    WORKERS_KEY, plus the source workbook when the frame holds several regions.
     """
-    headers = {'Content-Type': 'application/json'}
-    success_count, fail_count = 0, 0
-
-    for idx, row in df.iterrows():
-        payload = {
-            "okved_group": row["okved_group"],
-            "worker_num": round(row["worker_num"], 3),
-            "year": int(row["year"])
-        }
-
-        response = requests.post(api_url, json=payload, headers=headers)
-        if response.status_code == 201:
-            success_count += 1
-        else:
-            fail_count += 1
-            print(f"❌ Failed at row {idx}: {response.status_code} — {response.text}")
-
-    print(f"\n✅ Sent {success_count} rows successfully.")
-    if fail_count:
-        print(f"⚠️ Failed to send {fail_count} rows.")
+    return WORKERS_KEY + [SOURCE_FIELD] if SOURCE_FIELD in df.columns else WORKERS_KEY
 
+def send_data_to_api(df: pd.DataFrame, api_url: str, uploader: Uploader = None,
+                     journal: CheckpointJournal = None, sync: bool = False):
+    """
+    Sends each row of the DataFrame to the specified FastAPI endpoint using POST.
+    Frames from several workbooks are refused: the API cannot tell their
+    regions apart, so their (okved_group, year) rows would overwrite each other.
+    """
+    if SOURCE_FIELD in df.columns and df[SOURCE_FIELD].nunique() > 1:
+        raise ValueError(f"{api_url} has no region column, upload one workbook at a time")
+    rows = iter_payloads(
+        df,
+        WORKERS_FIELDS,
+        casts={"worker_num": rounded(3), "year": as_int}
+    )
+    if sync:
+        result = sync_rows(api_url, rows, WORKERS_KEY, uploader)
+    else:
+        result = upload_rows(api_url, rows, uploader, journal=journal)
+
+    print(f"\n✅ Sent {result.success_count} rows successfully.")
+    if result.fail_count:
+        print(f"⚠️ Failed to send {result.fail_count} rows.")
+
+
+
+AGRICULTURE = "сельское, лесное хозяйство, охота, рыболовство и рыбоводство"
+
+# Разметка листов сборника: первые 19 строк под шапкой — группы ОКВЭД,
+# дальше идут проценты
+OKVED_LAYOUTS = (
+    SheetLayout(sheet='1', header=6, id_column="okved_group", value_column="worker_num",
+                first_year=2010, last_year=2016, n_rows=19, capitalize=True),
+    # на втором листе название сельского хозяйства записано иначе — нормализуем
+    SheetLayout(sheet='2', header=6, id_column="okved_group", value_column="worker_num",
+                first_year=2017, last_year=2023, n_rows=19, capitalize=True,
+                normalize=((r'(?i)^сельское.*', AGRICULTURE),)),
+)
 
 
 def parse_okved(file_path: str) -> pd.DataFrame:
@@ -34,63 +76,66 @@ def parse_okved(file_path: str) -> pd.DataFrame:
     Reads the Excel file, extracts and reshapes the data from sheets '1' and '2',
     and returns a DataFrame with columns [year, worker_num, okved_group].
     """
-    xls = pd.ExcelFile(file_path)
-    data_frames = []
-
-
-    for sheet in xls.sheet_names:
-        if sheet.lower() == "содержание":
-            continue
-
-        # чтение и переименование колонок
-        if sheet == '1' or sheet == '2':
-            df = pd.read_excel(xls, sheet_name=sheet, header=6)
-            df.rename(columns={df.columns[0]: "okved_group"}, inplace=True)
-            years = ["2010", "2011", "2012", "2013", "2014", "2015", "2016"] if sheet == '1' \
-                else ["2017", "2018", "2019", "2020", "2021", "2022", "2023"]
-            for idx, year in enumerate(years, start=1):
-                df.rename(columns={df.columns[idx]: year}, inplace=True)
-
-            # Оставляем только первые 19 строк (далше идут проценты)
-            df_cleaned = df.iloc[:19, :]
-
-            desired_name = "сельское, лесное хозяйство, охота, рыболовство и рыбоводство"
-            # если это второй лист — нормализуем название группы
-            if sheet == '2':
-                df_cleaned['okved_group'] = df_cleaned['okved_group'] \
-                    .replace(
-                    regex=r'(?i)^сельское.*',
-                    value=desired_name
-                )
-
-            # Переводим в длинный формат
-            df_long = df_cleaned.melt(
-                id_vars="okved_group",
-                value_vars=years,
-                var_name="year",
-                value_name="worker_num"
-            )
-            df_long["year"] = df_long["year"].astype(int)
-            df_long["worker_num"] = df_long["worker_num"].astype(float)
-            data_frames.append(df_long)
-
-    # Объединяем все года и сохраняем
-    result_df = pd.concat(data_frames, ignore_index=True)
-
-    # Приводим первую букву каждой группы к верхнему регистру
-    result_df["okved_group"] = result_df["okved_group"].str.capitalize()
-
-    result_df.to_csv('jobs_minstat_out.csv', index=False)
+    result_df = parse_workbook(file_path, OKVED_LAYOUTS)
+    result_df.to_csv(Path(file_path).with_name('jobs_minstat_out.csv'), index=False)
     return result_df
 
 
-# Запуск
-df = parse_okved("Среднегодовая_численность_занятых_по_видам_деятельности_в_Пермском.xlsx")
+def parse_okved_many(sources, workers: int = None) -> pd.DataFrame:
+    """
+    Parses many regional workbooks with the same layout in a process pool
+    (see common.rosstat.parse_workbooks).
+    """
+    return parse_workbooks(sources, OKVED_LAYOUTS, workers)
+
+
+# Сборник Пермского края, который грузится по умолчанию
+xlsx_file_path = str(Path(__file__).with_name(
+    "Среднегодовая_численность_занятых_по_видам_деятельности_в_Пермском.xlsx"
+))
 
-print(df.head())  # Вывод первых строк для проверки
+# Куда сохраняются разобранные сборники нескольких регионов
+regions_csv_path = str(Path(__file__).with_name('jobs_minstat_regions_out.csv'))
 
-# Отправка данных на API
 api_url = "http://localhost:8000/api/minstat-workers/"
-send_data_to_api(df, api_url)
 
 
+def main(argv=None):
+    # Запуск: без аргументов — сборник Пермского края; можно передать
+    # несколько файлов или папок со сборниками других регионов
+    parser = loader_parser("Parse Rosstat employment workbooks and upload them")
+    parser.add_argument('sources', nargs='*', help='workbooks or folders of workbooks')
+    parser.add_argument('--workers', type=int, default=None, help='parser processes')
+    args = parser.parse_args(argv)
+
+    with METRICS.stage("stat_otchetnost", "load"):
+        if args.sources:
+            df = parse_okved_many(args.sources, args.workers)
+        else:
+            df = parse_okved(xlsx_file_path)
+
+    print(df.head())  # Вывод первых строк для проверки
+
+    # Сборники разных регионов различаются только файлом-источником
+    key_fields = workers_key(df)
+    with METRICS.stage("stat_otchetnost", "dedupe"):
+        df = drop_duplicate_rows(df, key_fields,
+                                 columns=WORKERS_FIELDS + key_fields[len(WORKERS_KEY):],
+                                 name="Minstat workers")
+
+    if args.sources:
+        # В API нет поля региона: несколько сборников только разбираются
+        df.to_csv(regions_csv_path, index=False)
+        print(f"⚠️ {api_url} has no region column, several workbooks are not uploaded. "
+              f"Parsed rows saved to {regions_csv_path}")
+    else:
+        # Отправка данных на API
+        with uploader_from_args(args) as uploader, \
+                journal_from_args(args, xlsx_file_path, WORKERS_KEY) as journal, \
+                METRICS.stage("stat_otchetnost", "upload"):
+            send_data_to_api(df, api_url, uploader, journal, sync=args.sync)
+    write_metrics(args)
+
+
+if __name__ == "__main__":
+    main()
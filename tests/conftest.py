@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The loaders are run as scripts; make ``common`` and ``<loader>.main`` importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,100 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+import common.sync
+from hr import main as hr
+from hr.main import aggregate_incremental, load_and_aggregate, save_incremental_state
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'bench'))
+from mock_api import MockApi
+
+HEADER = "id,entry_date,professional_roles_name,name\n"
+
+
+def write_rows(path, rows, mode='w'):
+    with open(path, mode, encoding='utf-8') as f:
+        if mode == 'w':
+            f.write(HEADER)
+        for i, (day, role) in enumerate(rows):
+            f.write(f"{i},{day},{role},Вакансия\n")
+
+
+def normalized(df: pd.DataFrame) -> list:
+    df = df.sort_values(['entry_date', 'professional_role'])
+    return list(zip(df['entry_date'], df['professional_role'].astype(str), df['vacancies_num'].astype(int)))
+
+
+def test_incremental_matches_full_recompute(tmp_path):
+    csv_path = tmp_path / 'perm_krai.csv'
+    # Chunks of two rows: "Аналитик" and "Водитель" only appear in some chunks
+    write_rows(csv_path, [
+        ("01.03.2024", "Программист"),
+        ("01.03.2024", "Аналитик"),
+        ("02.03.2024", "Программист"),
+        ("03.03.2024", "Программист"),
+        ("03.03.2024", "Водитель"),
+    ])
+    all_counts, changed = aggregate_incremental(str(csv_path), chunksize=2)
+    assert normalized(all_counts) == normalized(load_and_aggregate(str(csv_path)))
+    assert normalized(changed) == normalized(all_counts)
+    save_incremental_state(str(csv_path), all_counts)
+
+    # The next dump adds rows for the watermark day and later days
+    write_rows(csv_path, [
+        ("03.03.2024", "Водитель"),
+        ("03.03.2024", "Повар"),
+        ("04.03.2024", "Аналитик"),
+        ("05.03.2024", "Программист"),
+        ("05.03.2024", "Повар"),
+    ], mode='a')
+    all_counts, changed = aggregate_incremental(str(csv_path), chunksize=2)
+
+    assert normalized(all_counts) == normalized(load_and_aggregate(str(csv_path)))
+    assert normalized(all_counts) == normalized(load_and_aggregate(str(csv_path), chunksize=3))
+    # Only the watermark day and the new days are uploaded again
+    assert sorted(set(changed['entry_date'])) == ['2024-03-03', '2024-03-04', '2024-03-05']
+    assert ('2024-03-03', 'Водитель', 2) in normalized(changed)
+
+
+def test_state_is_not_written_before_saving(tmp_path):
+    csv_path = tmp_path / 'perm_krai.csv'
+    write_rows(csv_path, [("01.03.2024", "Программист")])
+    aggregate_incremental(str(csv_path), chunksize=2)
+    assert not (tmp_path / 'perm_krai.csv.watermark.json').exists()
+
+    # Without saved state a failed upload is simply redone in full
+    write_rows(csv_path, [("02.03.2024", "Программист")], mode='a')
+    _, changed = aggregate_incremental(str(csv_path), chunksize=2)
+    assert sorted(changed['entry_date']) == ['2024-03-01', '2024-03-02']
+
+
+def test_incremental_upload_does_not_read_the_table_back(tmp_path, monkeypatch):
+    def fetch_all(*args, **kwargs):
+        raise AssertionError("an incremental run must not fetch the whole table")
+
+    monkeypatch.setattr(common.sync, 'fetch_all', fetch_all)
+    csv_path = tmp_path / 'perm_krai.csv'
+    monkeypatch.setattr(hr, 'csv_file_path', str(csv_path))
+    write_rows(csv_path, [
+        ("01.03.2024", "Программист"),
+        ("02.03.2024", "Программист"),
+        ("02.03.2024", "Аналитик"),
+    ])
+    with MockApi() as api:
+        monkeypatch.setattr(hr, 'api_endpoint', f"{api.base_url}/api/hh-ru-dataset/")
+        hr.main(['--incremental'])
+
+        # The watermark day gets one more vacancy and a new role, then a new day
+        write_rows(csv_path, [
+            ("02.03.2024", "Программист"),
+            ("02.03.2024", "Повар"),
+            ("03.03.2024", "Аналитик"),
+        ], mode='a')
+        hr.main(['--incremental'])
+        stored = list(api.tables['/api/hh-ru-dataset'].values())
+
+    expected = normalized(load_and_aggregate(str(csv_path)))
+    assert sorted((row['entry_date'], row['professional_role'], row['vacancies_num'])
+                  for row in stored) == sorted(expected)
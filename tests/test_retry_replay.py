@@ -0,0 +1,40 @@
+import json
+import sys
+from pathlib import Path
+
+from common.retry import replay_dead_letters
+from common.uploader import Uploader
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'bench'))
+from mock_api import MockApi
+
+
+def write_entries(path, api_url, codes):
+    with open(path, 'w', encoding='utf-8') as f:
+        for code in codes:
+            entry = {'api_url': api_url, 'method': 'POST', 'expected_status': 201,
+                     'idx': code, 'payload': {'code': code}, 'reason': 'HTTP 503'}
+            f.write(json.dumps(entry) + '\n')
+
+
+def stored_codes(api):
+    return sorted(row['code'] for row in api.tables['/api/rows'].values())
+
+
+def test_interrupted_replay_is_resumed_before_new_dead_letters(tmp_path):
+    path = tmp_path / 'failed_rows.jsonl'
+    leftover = tmp_path / 'failed_rows.jsonl.replaying'
+    with MockApi() as api, Uploader(concurrency=2) as uploader:
+        api_url = f"{api.base_url}/api/rows/"
+        write_entries(leftover, api_url, [1, 2])
+        write_entries(path, api_url, [3])
+
+        replay_dead_letters(path, uploader)
+        assert stored_codes(api) == [1, 2]
+        assert not leftover.exists()
+        assert path.exists()
+
+        replay_dead_letters(path, uploader)
+        assert stored_codes(api) == [1, 2, 3]
+        assert not leftover.exists()
+        assert not path.exists()
@@ -0,0 +1,59 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from common.dedup import drop_duplicate_rows
+from common.uploader import Uploader
+from stat_otchetnost import main as stat_otchetnost
+from stat_otchetnost.main import (WORKERS_FIELDS, parse_okved_many, send_data_to_api,
+                                  workers_key, xlsx_file_path)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'bench'))
+from mock_api import MockApi
+
+
+@pytest.fixture
+def two_regions(tmp_path):
+    # The same collection under two region names: every (okved_group, year) overlaps
+    for name in ('perm.xlsx', 'udmurtia.xlsx'):
+        shutil.copy(xlsx_file_path, tmp_path / name)
+    return parse_okved_many([str(tmp_path)], workers=2)
+
+
+def test_dedupe_keeps_regions_with_overlapping_keys_apart(two_regions):
+    key_fields = workers_key(two_regions)
+    assert key_fields == ['okved_group', 'year', 'source_file']
+
+    df = drop_duplicate_rows(two_regions, key_fields, columns=WORKERS_FIELDS + ['source_file'])
+    per_region = len(df[df['source_file'] == 'perm.xlsx'])
+    assert len(df) == 2 * per_region
+
+
+def test_several_regions_are_not_uploaded(two_regions, tmp_path, monkeypatch):
+    with MockApi() as api, Uploader(concurrency=2) as uploader:
+        api_url = f"{api.base_url}/api/minstat-workers/"
+        with pytest.raises(ValueError):
+            send_data_to_api(two_regions, api_url, uploader)
+
+        monkeypatch.setattr(stat_otchetnost, 'api_url', api_url)
+        monkeypatch.setattr(stat_otchetnost, 'regions_csv_path', str(tmp_path / 'regions.csv'))
+        stat_otchetnost.main([str(tmp_path), '--no-journal', '--workers', '2'])
+        assert api.rows == 0
+
+    saved = pd.read_csv(tmp_path / 'regions.csv')
+    assert set(saved['source_file']) == {'perm.xlsx', 'udmurtia.xlsx'}
+
+
+def test_single_workbook_payload_has_only_api_fields(tmp_path):
+    shutil.copy(xlsx_file_path, tmp_path / 'perm.xlsx')
+    df = parse_okved_many([str(tmp_path)], workers=1)
+
+    with MockApi() as api, Uploader(concurrency=2) as uploader:
+        send_data_to_api(df, f"{api.base_url}/api/minstat-workers/", uploader)
+        stored = list(api.tables['/api/minstat-workers'].values())
+
+    assert len(stored) == len(df)
+    assert {frozenset(row) - {'id'} for row in stored} == {frozenset(WORKERS_FIELDS)}